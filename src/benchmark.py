@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# coding: utf-8
+""" A benchmark of the memory used by the players and tournaments loaded from the database.
+Run it with 'python src/benchmark.py': it saves a generated archive in a temporary directory, loads it again and
+displays the memory (measured with tracemalloc) and the number of memory blocks kept by the loaded objects. """
+
+
+# imports ------------------------------------------------------------------------------------------------------------
+# python standard library imports
+import random
+import tempfile
+import tracemalloc
+from datetime import date
+
+# outside libraries imports
+# local imports
+from models import Player, Tournament, Round, Match
+from controllers import Loader
+
+
+# constants ----------------------------------------------------------------------------------------------------------
+NUMBER_OF_PLAYERS = 2000
+NUMBER_OF_TOURNAMENTS = 500
+PLACES = ["Paris", "Lyon", "Marseille", "Lille", "Bordeaux", "Nantes", "Toulouse", "Strasbourg"]
+TIME_CONTROLS = ["Bullet", "Blitz", "Coup rapide"]
+GENDERS = ["Homme", "Femme", "Autre"]
+
+
+# functions ----------------------------------------------------------------------------------------------------------
+def loader_in(directory: str):
+    """ Return a Loader using a database in the given directory. """
+    loader = Loader([], [])
+    loader.database_directory = directory
+    return loader
+
+
+def save_archive(directory: str):
+    """ Generate and save an archive of players and tournaments in the given directory. """
+    random.seed(0)
+    loader = loader_in(directory)
+    Player.uid = 0
+    for number in range(NUMBER_OF_PLAYERS):
+        loader.players.append(Player(f"Prénom{number % 200}", f"Nom{number}", date(1990, 1, 1 + number % 28),
+                                     random.choice(GENDERS), number + 1))
+    for number in range(NUMBER_OF_TOURNAMENTS):
+        players = random.sample(loader.players, 8)
+        rounds = []
+        for round_number in range(1, 5):
+            random.shuffle(players)
+            rounds.append(Round(f"Round {round_number}", [Match(players[index], players[index + 1], 1, 0)
+                                                          for index in range(0, 8, 2)]))
+            rounds[-1].close()
+        loader.tournaments.append(Tournament(f"Tournoi {number}", random.choice(PLACES), date(2021, 6, 1),
+                                             random.choice(TIME_CONTROLS), "", players=players, rounds=rounds))
+    loader.save_players()
+    loader.save_tournaments()
+
+
+def measure_loading(directory: str):
+    """ Load the archive saved in the given directory, and return the memory size and the number of memory blocks
+    which are still allocated after the loading. """
+    loader = loader_in(directory)
+    tracemalloc.start()
+    loader.load_players()
+    loader.load_tournaments()
+    statistics = tracemalloc.take_snapshot().statistics("filename")
+    tracemalloc.stop()
+    return sum(stat.size for stat in statistics), sum(stat.count for stat in statistics)
+
+
+# execution ----------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        save_archive(temporary_directory)
+        size, count = measure_loading(temporary_directory)
+    print(f"{NUMBER_OF_PLAYERS} joueurs et {NUMBER_OF_TOURNAMENTS} tournois chargés : "
+          f"{size / 1024:.0f} Kio, {count} blocs mémoire.")
@@ -6,209 +6,367 @@
 # python standard library imports
 import re
 import os
-from os.path import join, dirname, abspath
+import csv
+import json
+import pickle
+import sys
+import zlib
+from os.path import join, dirname, abspath, splitext
 from datetime import date, datetime
+from functools import lru_cache
+from time import perf_counter
 
 # outside libraries imports
-from tinydb import TinyDB
+# tinydb is imported by Loader._open, only when the database is needed, to speed up the startup
 
 # local imports
-from models import Player, Tournament, Round, Match
-from views import View, PlayerView, TournamentView
+from models import Player, Tournament, Round, Match, RankIndex, DuplicateIndex
+from events import bus
+from views import View, PlayerView, TournamentView, ReportView
+
+
+# constants ----------------------------------------------------------------------------------------------------------
+# scores of a match, depending on the winner number entered ('0' for a draw)
+RESULTS = {"0": (0.5, 0.5), "1": (1, 0), "2": (0, 1)}
+# maximum time (in seconds) between the launch of the app and the display of the main menu
+STARTUP_BUDGET = 0.2
+
+
+# validators ---------------------------------------------------------------------------------------------------------
+# Each validator returns the valid (and normalized) value of a raw string entry, None if the entry is invalid, or False
+# if the field must take its default value. Validators of often repeated values are memoized.
+FRENCH_DATE_PATTERN = re.compile(r"(\d{2})/(\d{2})/(\d{4})")
+NAME_SEPARATORS_PATTERN = re.compile(r"([\-]+|[ ]+|[']+)")
+GENDERS = {"H": "Homme", "F": "Femme", "A": "Autre"}
+TIME_CONTROLS = ("Bullet", "Blitz", "Coup rapide")
+PAIRING_SYSTEMS = ("Suisse", "Toutes rondes", "Coupe")
+
+
+@lru_cache(maxsize=65536)
+def validate_date(date_str: str):
+    """ Control and transform a french date string "jj/mm/aaaa" into a python date object. """
+    match = FRENCH_DATE_PATTERN.fullmatch(date_str)
+    if match is None:
+        return None
+    try:
+        return date(int(match[3]), int(match[2]), int(match[1]))
+    except ValueError:
+        return None
+
+
+def validate_optional_date(date_str: str):
+    """ Control a date which takes a default value when it is empty. """
+    if date_str == "":
+        return False
+    return validate_date(date_str)
+
+
+@lru_cache(maxsize=65536)
+def format_name(name_to_format: str):
+    """ Format a name: capitalize each word, keep one symbol between words, and strip symbols around the name. """
+    words = NAME_SEPARATORS_PATTERN.split(name_to_format)
+    return "".join(word.capitalize() if word.isalpha() else word[0] for word in words if word).strip(" -'")
+
+
+@lru_cache(maxsize=65536)
+def validate_name(name: str):
+    """ Control and format a name, which must only contain alphabetic caracters, <->, <'> or <space> symbols. """
+    if name.replace(" ", "").replace("-", "").replace("'", "").isalpha():
+        return sys.intern(format_name(name))
+    return None
+
+
+@lru_cache(maxsize=4096)
+def validate_text(text: str):
+    """ Control a non empty text, like a tournament name or place. """
+    if text == "":
+        return None
+    return sys.intern(text)
+
+
+def validate_description(description: str):
+    """ Control a description, which can be empty. """
+    return description
+
+
+def validate_gender(gender: str):
+    """ Control a gender ('H', 'F' or 'A'). """
+    return GENDERS.get(gender.upper())
+
+
+def validate_rank(rank: str):
+    """ Control a rank, which must be a strictly positive integer. """
+    if rank.isdecimal() and int(rank) > 0:
+        return int(rank)
+    return None
+
+
+def validate_time_control(time_control: str):
+    """ Control a time control ('bullet', 'blitz' or 'coup rapide'). """
+    time_control = time_control.capitalize()
+    return time_control if time_control in TIME_CONTROLS else None
+
+
+def validate_pairing_system(pairing_system: str):
+    """ Control a pairing system ('suisse', 'toutes rondes' or 'coupe'), 'suisse' by default. """
+    pairing_system = pairing_system.capitalize()
+    if pairing_system == "":
+        return "Suisse"
+    return pairing_system if pairing_system in PAIRING_SYSTEMS else None
+
+
+def number_validator(default: int):
+    """ Return a validator of positive integers, with a default value for empty entries. """
+    def validate_number(number: str):
+        """ Control a positive integer. """
+        if number == "":
+            return default
+        elif number.isdecimal():
+            return int(number)
+        return None
+    return validate_number
+
+
+class Schema:
+    """ A declarative description of the fields needed to create a model instance: each field is controlled by a
+    validator. It is shared by the interactive creators and the non-interactive ingestion of raw data. """
+    def __init__(self, cls, validators: dict):
+        """ The class initiator. It needs the model class and its fields validators ({field name: validator}). """
+        self.cls = cls
+        self.validators = validators
+
+    def validate(self, row: dict):
+        """ Control a row of raw strings ({field name: raw entry}), and return the model keyword arguments, and the
+        list of the invalid fields names. """
+        kwargs, errors = self.validate_batch([row])
+        return kwargs[0], errors.get(0, [])
+
+    def validate_batch(self, rows: list):
+        """ Control many rows of raw strings at once, and return the list of their model keyword arguments (None for
+        invalid rows), and the invalid fields names of each invalid row ({row index: [field names]}).
+        Rows are controlled column by column, so each validator is applied to a whole column at once. """
+        columns = {field: list(map(validator, [row.get(field, "") for row in rows]))
+                   for field, validator in self.validators.items()}
+        results = []
+        errors = {}
+        for index, values in enumerate(zip(*columns.values())):
+            invalid_fields = [field for field, value in zip(columns, values) if value is None]
+            if invalid_fields:
+                errors[index] = invalid_fields
+                results.append(None)
+            else:
+                # 'field: False' items are deleted, so they take default value when given to the model initiator
+                results.append({field: value for field, value in zip(columns, values) if value is not False})
+        return results, errors
+
+    def create(self, row: dict):
+        """ Return a model instance from a row of raw strings, or None if the row is invalid. """
+        kwargs, errors = self.validate(row)
+        if errors:
+            return None
+        return self.cls(**kwargs)
+
+
+PLAYER_SCHEMA = Schema(Player, {
+    "first_name": validate_name,
+    "last_name": validate_name,
+    "birth_date": validate_date,
+    "gender": validate_gender,
+    "rank": validate_rank,
+})
+TOURNAMENT_SCHEMA = Schema(Tournament, {
+    "name": validate_text,
+    "place": validate_text,
+    "beginning_date": validate_date,
+    "ending_date": validate_optional_date,
+    "time_control": validate_time_control,
+    "pairing_system": validate_pairing_system,
+    "description": validate_description,
+    "number_of_rounds": number_validator(4),
+    "number_of_players": number_validator(8),
+})
+
+
+# events -------------------------------------------------------------------------------------------------------------
+def publish_result(tournament: Tournament, round_index: int, match_index: int):
+    """ Publish the current result of a match (entered, undone, redone or corrected). """
+    match = tournament.rounds[round_index].matches[match_index]
+    bus.publish("result_entered", tournament=tournament.uid, round=round_index, match=match_index,
+                players=[match.p1.uid, match.p2.uid], scores=list(match.scores))
 
 
 # controllers classes -------------------------------------------------------------------------------------------------
 class BasicCreator:
-    """ A basic class to control Player and Tournament creation. """
-    def __init__(self, view: View):
-        """ The class initiatior. It just needs a View. """
+    """ A basic class to control Player and Tournament creation, with the fields described by a Schema. """
+    def __init__(self, view: View, schema: Schema):
+        """ The class initiatior. It needs a View, and the Schema of the created objects. """
         self.view = view
+        self.schema = schema
+        # the view methods and validators are looked up once, instead of each time an entry is asked
+        self.fields = {field: (getattr(view, f"enter_{field}"), validator)
+                       for field, validator in schema.validators.items()}
 
-    def run(self, cls, kwargs: dict, default_values: bool = False):
-        """ The main method which needs to be called to execute a Player/Tournament creation.
-        It calls self.view.get_<attribute>() for each given attribute in kwargs attribute, while the returned value
-        is None. If the return of this call is False, then the attribute will take a default value. """
-        for data in kwargs:
-            while kwargs[data] is None:
-                kwargs[data] = self.__getattribute__(f"get_{data}")()
+    def run(self):
+        """ The main method which needs to be called to execute a Player/Tournament creation. """
+        return self.schema.cls(**self.enter_kwargs())
+
+    def enter_kwargs(self):
+        """ Return the keyword arguments of the created object, entered by the user.
+        For each field of the schema, it calls self.view.enter_<field>() and controls the entry with the field
+        validator, while the returned value is None. If the validator returns False, then the field will take a
+        default value. """
+        kwargs = {}
+        for field, (enter, validate) in self.fields.items():
+            value = None
+            while value is None:
+                value = validate(enter())
+            kwargs[field] = value
         # delete 'key: False' items, so they take default value when given to Player/Tournament initiator
-        kwargs = {key: value for key, value in kwargs.items() if value is not False}
-        return cls(**kwargs)
-
-    @staticmethod
-    def _french_date_string_to_python_date(date_str: str):
-        """ A method to control and transform a french date string "jj/mm/aaaa" into a python date object. """
-        if re.match(r"\d{2}/\d{2}/\d{4}", date_str):
-            try:
-                treated_date = date(*(int(time_unit) for time_unit in reversed(date_str.split("/"))))
-            except (ValueError, TypeError):
-                treated_date = None
-        else:
-            treated_date = None
-        return treated_date
+        return {key: value for key, value in kwargs.items() if value is not False}
 
 
 class TournamentCreator(BasicCreator):
     """ A class to create Tournament objects. To create a Tournament instance, you must call the 'run' method. """
     def __init__(self, view: TournamentView):
         """ The class initiatior. It just needs a TournamentView. """
-        super().__init__(view)
+        super().__init__(view, TOURNAMENT_SCHEMA)
 
-    def run(self):
-        """" Return a Tournament instance (without players). """
-        tournament_kwargs = {
-            "name": None,
-            "place": None,
-            "beginning_date": None,
-            "ending_date": None,
-            "time_control": None,
-            "description": None,
-            "number_of_rounds": None,
-            "number_of_players": None,
-        }
-        return super().run(Tournament, tournament_kwargs)
-
-    def get_name(self):
-        """ A method to control a tournament name entry. """
-        name = self.view.enter_name()
-        if name == "":
-            return None
-        else:
-            return name
 
-    def get_place(self):
-        """ A method to control a tournament place entry. """
-        place = self.view.enter_place()
-        if place == "":
-            return None
-        else:
-            return place
+class PlayerCreator(BasicCreator):
+    """ A class to create Player objects. To create a Player instance, you must call the 'run' method. """
 
-    def get_beginning_date(self):
-        """ A method to control a tournament beginning date entry. """
-        beginning_date = self.view.enter_beginning_date()
-        return self._french_date_string_to_python_date(beginning_date)
+    def __init__(self, view: PlayerView, players: list = None):
+        """ The class initiatior. It needs a PlayerView, and the list of the known players, to detect duplicates. """
+        super().__init__(view, PLAYER_SCHEMA)
+        self.players = players if players is not None else []
+        self._duplicate_index = None
 
-    def get_ending_date(self):
-        """ A method to control a tournament ending date entry. """
-        ending_date = self.view.enter_ending_date()
-        if ending_date == "":
-            return False
-        else:
-            return self._french_date_string_to_python_date(ending_date)
-
-    def get_time_control(self):
-        """ A method to control a tournament time control entry. """
-        time_control = self.view.enter_time_control().capitalize()
-        if time_control in ("Bullet", "Blitz", "Coup rapide"):
-            return time_control
-        else:
-            return None
+    @property
+    def duplicate_index(self):
+        """ Return the index used to detect duplicated players, built on the first call. """
+        if self._duplicate_index is None:
+            self._duplicate_index = DuplicateIndex(self.players)
+        return self._duplicate_index
 
-    def get_number_of_rounds(self):
-        """ A method to control a tournament number of round entry. """
-        number_of_rounds = self.view.enter_number_of_rounds()
-        if number_of_rounds == "":
-            return 4
-        elif number_of_rounds.isdecimal():
-            return int(number_of_rounds)
-        else:
-            return None
-
-    def get_number_of_players(self):
-        """ A method to control a tournament number of players entry. """
-        number_of_players = self.view.enter_number_of_players()
-        if number_of_players == "":
-            return 8
-        elif number_of_players.isdecimal():
-            return int(number_of_players)
-        else:
-            return None
+    def run(self):
+        """" Return a Player instance, and publish its creation. If similar players are already known, the user can
+        chose one of them instead: this known player is then returned, and no player is created. """
+        kwargs = self.enter_kwargs()
+        similar_players = self.duplicate_index.similar(kwargs["first_name"], kwargs["last_name"], kwargs["birth_date"])
+        if similar_players:
+            choice = ""
+            while not (choice.isdecimal() and int(choice) <= len(similar_players)):
+                choice = self.view.enter_duplicate_choice(similar_players)
+            if choice != "0":
+                return similar_players[int(choice) - 1]
+        player = Player(**kwargs)
+        self.duplicate_index.add(player)
+        bus.publish("player_created", uid=player.uid, first_name=player.first_name, last_name=player.last_name,
+                    birth_date=player.birth_date.isoformat(), gender=player.gender, rank=player.rank)
+        return player
 
-    def get_description(self):
-        """ A method to control a tournament description entry. """
-        description = self.view.enter_description()
-        return description
+    def get_rank(self):
+        """ A method to control a player rank. """
+        return validate_rank(self.view.enter_rank())
 
 
-class PlayerCreator(BasicCreator):
-    """ A class to create Player objects. To create a Player instance, you must call the 'run' method. """
+class RoundRobinSchedule:
+    """ A precomputed round-robin schedule, built with Berger tables. All the pairings are computed once, when the
+    schedule is created, so each round is then a simple lookup. Only the seeds (the players UIDs, in their pairing
+    order) need to be saved: the tables are always computed the same way from them. """
+    def __init__(self, seeds: list):
+        """ The class initiator. It needs the players UIDs, sorted by seed. """
+        self.seeds = seeds
+        self.rounds = self._berger_tables(seeds)
 
-    def __init__(self, view: PlayerView):
-        """ The class initiatior. It just needs a PlayerView. """
-        super().__init__(view)
+    @classmethod
+    def from_players(cls, players: list):
+        """ Return a schedule for the given players, seeded by rank. """
+        return cls([player.uid for player in sorted(players, key=lambda p: p.rank)])
 
-    def run(self):
-        """" Return a Player instance. """
-        player_kwargs = {
-            "first_name": None,
-            "last_name": None,
-            "birth_date": None,
-            "gender": None,
-            "rank": None,
-        }
-        return super().run(Player, player_kwargs)
+    @property
+    def number_of_rounds(self):
+        """ Return the number of rounds needed for every player to meet every other player. """
+        return len(self.rounds)
 
     @staticmethod
-    def _name_is_valid(name):
-        """ Check if a string only contains alphabetic caracters, <->, <'> or <space> symbols. """
-        return name.replace(" ", "").replace("-", "").replace("'", "").isalpha()
+    def _berger_tables(seeds: list):
+        """ Return the list of rounds of a round-robin between the seeds, each round being a tuple of (white UID, black
+        UID) pairs, as in the published Berger tables. With an odd number of players, a dummy player is added and its
+        opponent is exempt. """
+        seeds = list(seeds)
+        if len(seeds) % 2:
+            seeds.append(None)
+        size = len(seeds)
+        last = size - 1
+        rounds = []
+        for round_index in range(last):
+            # the last seed is fixed and meets the seed 'first', which moves by half the players each round, with
+            # colors alternating; on the other boards, the seeds after 'first' have white against the seeds before it
+            first = round_index * size // 2 % last
+            if round_index % 2:
+                pairs = [(seeds[last], seeds[first])]
+            else:
+                pairs = [(seeds[first], seeds[last])]
+            for board in range(1, size // 2):
+                pairs.append((seeds[(first + board) % last], seeds[(first - board) % last]))
+            rounds.append(tuple(pair for pair in pairs if None not in pair))
+        return rounds
+
+    def pairings(self, tournament: Tournament, round_index: int):
+        """ Return the (white UID, black UID) pairs of the given round. """
+        return self.rounds[round_index]
+
+
+class KnockoutSchedule:
+    """ A precomputed knockout schedule, built with a seeded bracket: the best seed meets the worst one and the two
+    best seeds can only meet in the final. When the number of players is not a power of 2, the best seeds are exempt
+    from the first round. For a draw, the best seed goes through. """
+    def __init__(self, seeds: list):
+        """ The class initiator. It needs the players UIDs, sorted by seed. """
+        self.seeds = seeds
+        self.bracket = self._bracket(seeds)
+
+    @classmethod
+    def from_players(cls, players: list):
+        """ Return a schedule for the given players, seeded by rank. """
+        return cls([player.uid for player in sorted(players, key=lambda p: p.rank)])
+
+    @property
+    def number_of_rounds(self):
+        """ Return the number of rounds needed to get a winner. """
+        return max(len(self.bracket).bit_length() - 1, 1)
 
     @staticmethod
-    def _format_name(name_to_format):
-        """ A method to control and format a player name entry. """
-        name = ""
-        split_name = re.split(r"([\-]+|[ ]+|[']+)", name_to_format)
-        for word in split_name:
-            if word == "":
-                pass
-            elif word.isalpha():
-                name += word.capitalize()
-            else:
-                name += word[0]
-        while name.startswith((" ", "-", "'")):
-            name = name[1:]
-        while name.endswith((" ", "-", "'")):
-            name = name[0:-1]
-        return name
-
-    def _treat_name(self, name):
-        """ A method to coordinate several controls on a name entry. """
-        if self._name_is_valid(name):
-            return self._format_name(name)
-        else:
-            return None
+    def _bracket(seeds: list):
+        """ Return the seeds UIDs in their bracket order, with None for the exemptions. """
+        size = 1
+        while size < len(seeds):
+            size *= 2
+        order = [0]
+        while len(order) < size:
+            order = [position for seed in order for position in (seed, 2 * len(order) - 1 - seed)]
+        return [seeds[position] if position < len(seeds) else None for position in order]
+
+    def pairings(self, tournament: Tournament, round_index: int):
+        """ Return the (white UID, black UID) pairs of the given round, from the winners of the previous rounds. """
+        ranking = {uid: position for position, uid in enumerate(self.seeds)}
+        slots = self.bracket
+        for round_ in tournament.rounds[:round_index]:
+            winners = {}
+            for match in round_.matches:
+                if match.s1 > match.s2 or (match.s1 == match.s2 and ranking[match.p1.uid] < ranking[match.p2.uid]):
+                    winners[match.p1.uid] = winners[match.p2.uid] = match.p1.uid
+                else:
+                    winners[match.p1.uid] = winners[match.p2.uid] = match.p2.uid
+            slots = [winners.get(first, first) if second is None else winners.get(second, second)
+                     for first, second in zip(slots[::2], slots[1::2])]
+        return tuple((first, second) for first, second in zip(slots[::2], slots[1::2])
+                     if first is not None and second is not None)
 
-    def get_first_name(self):
-        """ A method to control a player first name entry. """
-        name = self.view.enter_first_name()
-        return self._treat_name(name)
-
-    def get_last_name(self):
-        """ A method to control a player last name entry. """
-        name = self.view.enter_last_name()
-        return self._treat_name(name)
-
-    def get_birth_date(self):
-        """ A method to control a player birth date. """
-        birth_date = self.view.enter_birth_date()
-        return self._french_date_string_to_python_date(birth_date)
-
-    def get_gender(self):
-        """ A method to control a player gender. """
-        gender = self.view.enter_gender().upper()
-        if gender in ("H", "F", "A"):
-            return {"H": "Homme", "F": "Femme", "A": "Autre"}[gender]
-        else:
-            return None
 
-    def get_rank(self):
-        """ A method to control a player rank. """
-        rank = self.view.enter_rank()
-        if rank.isdecimal() and rank != "0":
-            return int(rank)
-        else:
-            return None
+# the pairing systems with a precomputed schedule (the swiss system pairings are computed at the start of each round)
+SCHEDULES = {"Toutes rondes": RoundRobinSchedule, "Coupe": KnockoutSchedule}
 
 
 class TournamentRunner:
@@ -227,9 +385,21 @@ class TournamentRunner:
         execute the tournament and the scores entries. """
         # add players
         self.add_players()
+        # precompute the whole schedule if the pairing system allows it
+        self.build_schedule()
         # run the tournament with added players
         self._run()
 
+    def build_schedule(self):
+        """ Compute the schedule of the tournament from its players, if its pairing system has a precomputed one, and
+        adapt the tournament number of rounds to this schedule. """
+        if self.tournament.pairing_system not in SCHEDULES:
+            return
+        self.tournament.schedule = SCHEDULES[self.tournament.pairing_system].from_players(self.tournament.players)
+        if self.tournament.number_of_rounds != self.tournament.schedule.number_of_rounds:
+            self.tournament.number_of_rounds = self.tournament.schedule.number_of_rounds
+            self.view.display_message(f"Le tournoi se jouera en {self.tournament.number_of_rounds} rounds.")
+
     def add_players(self):
         """ A method to fill self.tournament.players list. """
         while len(self.tournament.players) < self.tournament.number_of_players:
@@ -251,8 +421,12 @@ class TournamentRunner:
                     self.tournament.players.append(player)
             elif answer == "2":
                 new_player = self.player_creator.run()
-                self.known_players.append(new_player)
-                self.tournament.players.append(new_player)
+                if new_player not in self.known_players:
+                    self.known_players.append(new_player)
+                if new_player in self.tournament.players:
+                    self.view.display_message("Ce joueur est déjà dans le tournoi !")
+                else:
+                    self.tournament.players.append(new_player)
             elif answer == "/list":
                 self.player_creator.view.list_players(self.known_players)
 
@@ -277,14 +451,11 @@ class TournamentRunner:
     def update_scores(self):
         """ Display scores and reset them for next round. """
         active_round = self.tournament.active_round
-        # reset all players scores (from previous sessions, tournaments and matches)
+        # reset all players scores (from previous sessions, tournaments and matches) with the cumulative sum of scores
+        # for this tournament, only recomputed from the last corrected round
+        scores = self.tournament.history.scores(self.tournament.rounds)
         for player in self.tournament.players:
-            player.score = 0
-        # make a cumulative sum of scores for this tournament
-        for round_ in self.tournament.rounds:
-            for match in round_.matches:
-                match.p1.score += match.s1
-                match.p2.score += match.s2
+            player.score = scores.get(player.uid, 0)
         # display scores
         if active_round != 0:
             message = f"Scores après {self.tournament.rounds[active_round - 1].name}"
@@ -299,7 +470,11 @@ class TournamentRunner:
         """ Generate new round and avoid players to compete several times against the same player. """
         round_name = self.get_round_name()
         players = self.tournament.players
-        if self.tournament.active_round == 0:
+        if self.tournament.schedule is not None:
+            players_by_uid = {player.uid: player for player in players}
+            pairings = self.tournament.schedule.pairings(self.tournament, self.tournament.active_round)
+            matches = [Match(players_by_uid[white], players_by_uid[black]) for white, black in pairings]
+        elif self.tournament.active_round == 0:
             sorted_players = sorted(players, key=lambda p: p.rank)
             best_sorted_players = sorted_players[:len(sorted_players)//2]
             worst_sorted_players = sorted_players[len(sorted_players)//2:]
@@ -324,43 +499,399 @@ class TournamentRunner:
             player_iterator = iter(sorted_players)
             matches = [Match(player, next(player_iterator)) for player in player_iterator]
         self.tournament.rounds.append(Round(round_name, matches))
+        bus.publish("round_generated", tournament=self.tournament.uid, round=len(self.tournament.rounds) - 1,
+                    name=round_name, matches=[[match.p1.uid, match.p2.uid] for match in matches])
 
     def get_round_name(self):
         """ Get a round name. """
         default_name = "Round " + str(self.tournament.active_round + 1)
         entry = self.view.enter_information(f"\n\nVeuillez saisir le nom du round (par défaut : '{default_name}').")
         if entry == "":
-            return default_name
+            return sys.intern(default_name)
         else:
-            return entry
+            return sys.intern(entry)
 
     def get_round_scores(self):
-        """ Ask the winner of the round and attribute the scores. """
-        for match in self.tournament.rounds[-1].matches:
-            self.view.display_message(match.__repr__())
+        """ Ask the winner of the round and attribute the scores. The previous result of the round can be undone with
+        '/annuler', and an undone result can be redone with '/retablir'. """
+        round_index = len(self.tournament.rounds) - 1
+        matches = self.tournament.rounds[-1].matches
+        match_index = 0
+        while match_index < len(matches):
+            self.view.display_message(matches[match_index].__repr__())
             winner_number = ""
-            while winner_number not in ("0", "1", "2"):
-                winner_number = self.view.enter_match_result()
-            if winner_number == "0":
-                match[0][1] = 0.5
-                match[1][1] = 0.5
+            while winner_number not in ("0", "1", "2", "/annuler", "/retablir"):
+                winner_number = self.view.enter_match_result().lower()
+            if winner_number == "/annuler":
+                if match_index > 0:
+                    self.tournament.history.undo(self.tournament.rounds)
+                    match_index -= 1
+                    publish_result(self.tournament, round_index, match_index)
+                else:
+                    self.view.display_message("Aucun résultat à annuler dans ce round.")
+            elif winner_number == "/retablir":
+                if self.tournament.history.next_change() is not None \
+                        and self.tournament.history.next_change()[:2] == (round_index, match_index):
+                    self.tournament.history.redo(self.tournament.rounds)
+                    publish_result(self.tournament, round_index, match_index)
+                    match_index += 1
+                else:
+                    self.view.display_message("Aucun résultat à rétablir.")
             else:
-                match[int(winner_number) - 1][1] = 1
-        self.tournament.rounds[-1].close()
+                self.tournament.set_result(round_index, match_index, RESULTS[winner_number])
+                publish_result(self.tournament, round_index, match_index)
+                match_index += 1
+        self.tournament.rounds[-1].close(self.tournament.uid, round_index)
 
 
-class Loader:
-    """ A class to manage players and tournaments, independently from any controller. """
-    def __init__(self, players, tournaments):
+class RankingSynchronizer:
+    """ A controller to update the players ranks from an official ranking file. The file is a CSV file (with ',' or ';'
+    delimiters) whose header contains a 'rank' column, and either an 'uid' column or 'first_name', 'last_name' and
+    'birth_date' (jj/mm/aaaa) columns to identify the players. """
+    def __init__(self, view: PlayerView, players: list, rank_index: RankIndex):
+        """ The class initiator. """
+        self.view = view
+        self.players = players
+        self.rank_index = rank_index
+
+    def run(self):
+        """ Ask for a ranking file, apply all its changes at once and display a summary. Return True if ranks were
+        changed, and need to be saved. """
+        path = self.view.enter_ranking_file_path().strip()
+        try:
+            ranks, unchanged, unknown, invalid = self.diff(path)
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            self.view.display_message(f"Impossible de lire le fichier de classement : {error}")
+            return False
+        changes = [(self.rank_index.players[uid], self.rank_index.players[uid].rank, rank)
+                   for uid, rank in ranks.items()]
+        self.rank_index.update_many(ranks)
+        for player, old_rank, rank in changes:
+            bus.publish("rank_changed", uid=player.uid, old_rank=old_rank, rank=rank)
+        self.view.display_ranking_sync_summary(changes, unchanged, unknown, invalid)
+        return bool(ranks)
+
+    def diff(self, path: str):
+        """ Compare the ranking file with the current players ranks, without modifying anything.
+        Return the new ranks ({player uid: rank}), the number of unchanged ranks, and the line numbers of unknown
+        players and invalid lines. """
+        ranks = {}
+        unchanged = 0
+        unknown = []
+        invalid = []
+        players_by_uid = {player.uid: player for player in self.players}
+        players_by_identity = None
+        with open(path, newline="", encoding="utf-8-sig") as ranking_file:
+            delimiter = ";" if ";" in ranking_file.readline() else ","
+            ranking_file.seek(0)
+            # the first line is the header
+            for line_number, line in enumerate(csv.DictReader(ranking_file, delimiter=delimiter), 2):
+                rank = validate_rank((line.get("rank") or "").strip())
+                if rank is None:
+                    invalid.append(line_number)
+                    continue
+                if line.get("uid"):
+                    uid = line["uid"].strip()
+                    player = players_by_uid.get(int(uid)) if uid.isdecimal() else None
+                else:
+                    if players_by_identity is None:
+                        players_by_identity = {(p.first_name, p.last_name, p.birth_date): p for p in self.players}
+                    birth_date = validate_date((line.get("birth_date") or "").strip())
+                    if birth_date is None:
+                        invalid.append(line_number)
+                        continue
+                    player = players_by_identity.get((format_name(line.get("first_name") or ""),
+                                                      format_name(line.get("last_name") or ""),
+                                                      birth_date))
+                if player is None:
+                    unknown.append(line_number)
+                elif player.rank == rank:
+                    unchanged += 1
+                else:
+                    ranks[player.uid] = rank
+        return ranks, unchanged, unknown, invalid
+
+
+class DuplicateMerger:
+    """ A controller to detect the duplicated players of the registry, and merge each group of duplicates into its
+    oldest player (the one with the smallest UID): all the tournaments references to the duplicates are rewritten in
+    a single pass. Players who played in a same tournament are never merged. """
+    def __init__(self, view: PlayerView, players: list, tournaments: list, duplicate_index: DuplicateIndex,
+                 rank_index: RankIndex):
+        """ The class initiator. """
+        self.view = view
         self.players = players
         self.tournaments = tournaments
+        self.duplicate_index = duplicate_index
+        self.rank_index = rank_index
+
+    def run(self):
+        """ Detect the duplicates, and merge them if the user confirms it. Return the modified tournaments (None if
+        nothing was merged). """
+        groups = self.find_groups()
+        if not groups:
+            self.view.display_message("Aucun doublon détecté.")
+            return None
+        if self.view.enter_merge_confirmation(groups).lower() != "o":
+            return None
+        tournaments = self.merge(groups)
+        number_of_duplicates = sum(len(group) - 1 for group in groups)
+        self.view.display_message(f"{number_of_duplicates} doublon{'s' * (number_of_duplicates > 1)} fusionné"
+                                  f"{'s' * (number_of_duplicates > 1)}.")
+        return tournaments
+
+    def find_groups(self):
+        """ Return the groups of likely duplicated players, without the players who played in a same tournament. """
+        candidate_groups = list(self.duplicate_index.groups())
+        tournaments_by_uid = {player.uid: set() for group in candidate_groups for player in group}
+        for index, tournament in enumerate(self.tournaments):
+            for player in tournament.players:
+                if player.uid in tournaments_by_uid:
+                    tournaments_by_uid[player.uid].add(index)
+        groups = []
+        for group in candidate_groups:
+            # each player joins the group only if it never met the players already kept in the group
+            kept_players = []
+            for player in group:
+                if all(tournaments_by_uid[player.uid].isdisjoint(tournaments_by_uid[kept_player.uid])
+                       for kept_player in kept_players):
+                    kept_players.append(player)
+            if len(kept_players) > 1:
+                groups.append(kept_players)
+        return groups
+
+    def merge(self, groups: list):
+        """ Merge each group of players into its first player, and return the modified tournaments. """
+        merged_into = {player.uid: group[0] for group in groups for player in group[1:]}
+        modified_tournaments = []
+        for tournament in self.tournaments:
+            modified = False
+            for index, player in enumerate(tournament.players):
+                if player.uid in merged_into:
+                    tournament.players[index] = merged_into[player.uid]
+                    modified = True
+            for round_ in tournament.rounds:
+                for match in round_.matches:
+                    for side in match:
+                        if side[0].uid in merged_into:
+                            side[0] = merged_into[side[0].uid]
+                            modified = True
+            if modified:
+                if tournament.schedule is not None:
+                    tournament.schedule = type(tournament.schedule)(
+                        [merged_into[uid].uid if uid in merged_into else uid for uid in tournament.schedule.seeds])
+                tournament.history.invalidate(0)
+                modified_tournaments.append(tournament)
+        # the players list and the indexes are rebuilt once, instead of removing the merged players one by one
+        self.duplicate_index.remove_many([player for player in self.players if player.uid in merged_into])
+        self.players[:] = [player for player in self.players if player.uid not in merged_into]
+        self.rank_index.remove_many(merged_into.keys())
+        for group in groups:
+            bus.publish("players_merged", uid=group[0].uid, merged=[player.uid for player in group[1:]])
+        return modified_tournaments
+
+
+class TournamentExporter:
+    """ A controller to export tournaments reports in CSV, PGN-style and HTML files. Each report is generated row by
+    row and written on the fly, and several tournaments are exported in parallel by a pool of workers, each one loading
+    the tournament it exports, so the whole archive is never loaded at once. """
+    def __init__(self, view: ReportView, directory: str, loader, workers: int = 4):
+        """ The class initiator. Reports are written in the given directory, and tournaments are loaded by the given
+        Loader. """
+        self.view = view
+        self.directory = directory
+        self.loader = loader
+        self.workers = workers
+        self.loaded_tournaments = {}
+
+    def export_all(self, headers):
+        """ Export the tournaments of the given manifest headers (each one in its own directory), and a season index
+        listing them. The index is written from the headers only. The tournaments already loaded are exported from
+        memory, the others are read from their files. Unreadable tournaments are skipped. """
+        from concurrent.futures import ThreadPoolExecutor
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        self.loaded_tournaments = {tournament.uid: tournament for tournament in self.loader.tournaments}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # each worker loads, exports and forgets a tournament, only the small headers are kept
+            exported_headers = [header for header in executor.map(self._export_header, headers) if header is not None]
+        header = ["Tournoi", "Lieu", "Début", "Fin", "Contrôle du temps", "Rounds", "Joueurs"]
+        self.view.write_csv(join(self.directory, "tournois.csv"), header, self.header_rows(exported_headers))
+        self.view.write_html(join(self.directory, "index.html"), "Tournois", [(
+            "Tournois", header,
+            ([(row[0], f"{self._directory_name(tournament_header['name'], tournament_header['uid'])}/index.html")]
+             + row[1:] for tournament_header, row in zip(exported_headers, self.header_rows(exported_headers)))
+        )])
+
+    def _export_header(self, header: dict):
+        """ Load and export the tournament of a manifest header, and return the header (None if the tournament is
+        unreadable). """
+        tournament = self.loaded_tournaments.get(header["uid"]) or self.loader.load_tournament(header)
+        if tournament is None:
+            return None
+        self.export(tournament)
+        return header
+
+    def export(self, tournament: Tournament):
+        """ Export a tournament reports in its own directory, and return this directory. """
+        directory = join(self.directory, self._directory_name(tournament.name, tournament.uid))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        match_header = ["Round", "Échiquier", "Blancs", "Score blancs", "Noirs", "Score noirs"]
+        standings_header = ["Place", "Joueur", "Classement", "Score"]
+        crosstable_header = ["Place", "Joueur"] + [f"R{number}" for number in range(1, len(tournament.rounds) + 1)] \
+            + ["Score"]
+        self.view.write_csv(join(directory, "matchs.csv"), match_header, self.match_rows(tournament))
+        self.view.write_csv(join(directory, "classement.csv"), standings_header, self.standings_rows(tournament))
+        self.view.write_csv(join(directory, "grille.csv"), crosstable_header, self.crosstable_rows(tournament))
+        self.view.write_pgn(join(directory, "resultats.pgn"), self.pgn_games(tournament))
+        self.view.write_html(join(directory, "index.html"), tournament.__repr__(), [
+            ("Classement", standings_header, self.standings_rows(tournament)),
+            ("Grille américaine", crosstable_header, self.crosstable_rows(tournament)),
+            ("Matchs", match_header, self.match_rows(tournament)),
+        ])
+        return directory
+
+    @staticmethod
+    def _directory_name(name: str, uid: int):
+        """ Return the name of the directory of a tournament reports, unique thanks to the tournament UID. """
+        return f"{uid}_{re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')}"
+
+    @staticmethod
+    def _result(match: Match):
+        """ Return a match result, in PGN notation ('*' if the match has not been played). """
+        if match.s1 == match.s2 == 0:
+            return "*"
+        return {1: "1-0", 0: "0-1"}.get(match.s1, "1/2-1/2")
+
+    @staticmethod
+    def header_rows(headers):
+        """ Generate the rows of the tournaments list, from the tournaments manifest headers. """
+        for header in headers:
+            yield [header["name"], header["place"], date(*header["beginning_date"]), date(*header["ending_date"]),
+                   header["time_control"], header["number_of_rounds"], header["number_of_players"]]
 
-        # db initialisation
+    @staticmethod
+    def match_rows(tournament: Tournament):
+        """ Generate the rows of the matches of a tournament. """
+        for round_ in tournament.rounds:
+            for board, match in enumerate(round_.matches, 1):
+                yield [round_.name, board, f"{match.p1.first_name} {match.p1.last_name}", match.s1,
+                       f"{match.p2.first_name} {match.p2.last_name}", match.s2]
+
+    @staticmethod
+    def _standings(tournament: Tournament):
+        """ Return the tournament players sorted by score (and by rank for equal scores), and their scores. """
+        scores = tournament.history.scores(tournament.rounds)
+        return sorted(tournament.players, key=lambda p: (-scores.get(p.uid, 0), p.rank)), scores
+
+    def standings_rows(self, tournament: Tournament):
+        """ Generate the rows of the standings of a tournament. """
+        players, scores = self._standings(tournament)
+        for place, player in enumerate(players, 1):
+            yield [place, f"{player.first_name} {player.last_name}", player.rank, scores.get(player.uid, 0)]
+
+    def crosstable_rows(self, tournament: Tournament):
+        """ Generate the rows of the crosstable of a tournament: for each round, the place of the opponent and the
+        result ('+' for a win, '=' for a draw, '-' for a loss), or '' when the player was exempt. """
+        players, scores = self._standings(tournament)
+        places = {player.uid: place for place, player in enumerate(players, 1)}
+        cells = {player.uid: [""] * len(tournament.rounds) for player in players}
+        for round_index, round_ in enumerate(tournament.rounds):
+            for match in round_.matches:
+                for player, opponent, score, opponent_score in ((match.p1, match.p2, match.s1, match.s2),
+                                                                (match.p2, match.p1, match.s2, match.s1)):
+                    sign = "+" if score > opponent_score else "-" if score < opponent_score else "="
+                    cells[player.uid][round_index] = f"{sign}{places.get(opponent.uid, '?')}"
+        for place, player in enumerate(players, 1):
+            yield [place, f"{player.first_name} {player.last_name}"] + cells[player.uid] + [scores.get(player.uid, 0)]
+
+    def pgn_games(self, tournament: Tournament):
+        """ Generate the PGN tags of each match of a tournament. """
+        for round_number, round_ in enumerate(tournament.rounds, 1):
+            for board, match in enumerate(round_.matches, 1):
+                yield {
+                    "Event": tournament.name,
+                    "Site": tournament.place,
+                    "Date": tournament.beginning_date.strftime("%Y.%m.%d"),
+                    "Round": f"{round_number}.{board}",
+                    "White": f"{match.p1.last_name}, {match.p1.first_name}",
+                    "Black": f"{match.p2.last_name}, {match.p2.first_name}",
+                    "Result": self._result(match),
+                    "TimeControl": tournament.time_control,
+                }
+
+
+class Loader:
+    """ A class to manage players and tournaments, independently from any controller.
+    The database is sharded in the 'database' directory: players are saved in 'players.json', each tournament in its
+    own 'tournaments/tournament_<uid>.json' file, and 'manifest.json' keeps the header of each tournament (its main
+    information and the name of its file). A save only writes the changed files, and a tournament can be loaded
+    without reading the others. Results corrections are appended to a 'tournament_<uid>.corrections.jsonl' journal
+    next to the tournament file, until the tournament is saved again. """
+    def __init__(self, players, tournaments, workers: int = 8):
+        self.players = players
+        self.tournaments = tournaments
+        self.workers = workers
+        self.loaded = False
+        # the players can be loaded alone, by the actions reading the tournaments one by one
+        self.players_loaded = False
+        self.players_by_uid = {}
+        # headers of the tournaments whose file could not be read, skipped by the loading
+        self.unreadable_tournaments = []
+
+        # db paths initialisation, the db files are only opened when needed
         root_path = dirname(dirname(abspath(__file__)))
-        database_directory = join(root_path, "database")
-        if not os.path.exists(database_directory):
-            os.mkdir(database_directory)
-        self.db = TinyDB(join(database_directory, "db.json"))
+        self.database_directory = join(root_path, "database")
+
+    @property
+    def manifest_path(self):
+        """ Return the path of the manifest, which lists the tournaments headers. """
+        return join(self.database_directory, "manifest.json")
+
+    @property
+    def participations_path(self):
+        """ Return the path of the participations index, which lists the players UIDs of each tournament. """
+        return join(self.database_directory, "participations.json")
+
+    @property
+    def players_path(self):
+        """ Return the path of the players file. """
+        return join(self.database_directory, "players.json")
+
+    @property
+    def legacy_database_path(self):
+        """ Return the path of the unsharded database used by older versions. """
+        return join(self.database_directory, "db.json")
+
+    @property
+    def events_path(self):
+        """ Return the path of the events log. """
+        return join(self.database_directory, "events.jsonl")
+
+    @property
+    def snapshot_path(self):
+        """ Return the path of the warm-start snapshot. """
+        return join(self.database_directory, "snapshot.pickle")
+
+    def tournament_path(self, header: dict):
+        """ Return the path of the file of a tournament, from its header. """
+        return join(self.database_directory, "tournaments", header["file"])
+
+    def corrections_path(self, header: dict):
+        """ Return the path of the corrections journal of a tournament, from its header. """
+        return splitext(self.tournament_path(header))[0] + ".corrections.jsonl"
+
+    @staticmethod
+    def _open(path: str, read_only: bool = False):
+        """ Return a TinyDB database saved in the given file. tinydb is only imported on the first call, to speed up
+        the startup. A read-only database is never created: opening a missing file raises FileNotFoundError. """
+        from tinydb import TinyDB
+        if read_only:
+            return TinyDB(path, access_mode="r")
+        if not os.path.exists(dirname(path)):
+            os.makedirs(dirname(path))
+        return TinyDB(path)
 
     def serialized_player(self, player) -> dict:
         """ Return a serialized version of the player object. """
@@ -375,12 +906,13 @@ class Loader:
         }
 
     def unserialized_player(self, player) -> Player:
-        """ Return an Player instance from a serialized instance saved in a previous session. """
+        """ Return an Player instance from a serialized instance saved in a previous session. Repeated values are
+        interned, so all the players share the same strings. """
         clean_kwargs = {
             "first_name": player["first_name"],
             "last_name": player["last_name"],
             "birth_date": date(*player["birth_date"]),
-            "gender": player["gender"],
+            "gender": sys.intern(player["gender"]),
             "rank": player["rank"],
             "uid": player["uid"],
         }
@@ -401,45 +933,60 @@ class Loader:
             "number_of_players": tournament.number_of_players,
             "players": [player.uid for player in tournament.players],
             "rounds": [self.serialized_round(round_) for round_ in tournament.rounds],
+            "pairing_system": tournament.pairing_system,
+            # only the seeds are saved, the schedule is computed again from them
+            "schedule": tournament.schedule.seeds if tournament.schedule is not None else None,
+            "uid": tournament.uid,
         }
 
     def unserialized_tournament(self, tournament) -> Tournament:
-        """ Return an Tournament instance from a serialized instance saved in a previous session. """
+        """ Return an Tournament instance from a serialized instance saved in a previous session. Repeated values are
+        interned, so all the tournaments share the same strings. """
         clean_kwargs = {
             "name": tournament["name"],
-            "place": tournament["place"],
+            "place": sys.intern(tournament["place"]),
             "beginning_date": date(*tournament["beginning_date"]),
             "ending_date": date(*tournament["ending_date"]),
-            "time_control": tournament["time_control"],
+            "time_control": sys.intern(tournament["time_control"]),
             "description": tournament["description"],
             "number_of_rounds": tournament["number_of_rounds"],
             "number_of_players": tournament["number_of_players"],
-            "players": [self.players[uid] for uid in tournament["players"]],
+            "players": [self.players_by_uid[uid] for uid in tournament["players"]],
             "rounds": [self.unserialized_round(round_) for round_ in tournament["rounds"]],
+            "pairing_system": tournament.get("pairing_system", "Suisse"),
+            "uid": tournament.get("uid"),
         }
+        if tournament.get("schedule") is not None:
+            clean_kwargs["schedule"] = SCHEDULES[clean_kwargs["pairing_system"]](tournament["schedule"])
         return Tournament(**clean_kwargs)
 
     def serialized_round(self, round_: Round) -> dict:
         """ Return a serialized version of a Round object."""
-        b = round_.beginning_time
-        e = round_.ending_time
         return {
             "name": round_.name,
             "matches": [self.serialized_match(match) for match in round_.matches],
-            "beginning_time": (b.year, b.month, b.day, b.hour, b.minute),
-            "ending_time": (e.year, e.month, e.day, e.hour, e.minute),
+            "beginning_time": round_.beginning_time,
+            "ending_time": round_.ending_time,
         }
 
     def unserialized_round(self, round_: dict) -> Round:
         """ Return an unserialized version of a previously saved Round object."""
         clean_kwargs = {
-            "name": round_["name"],
+            "name": sys.intern(round_["name"]),
             "matches": [self.unserialized_match(match) for match in round_["matches"]],
-            "beginning_time": datetime(*round_["beginning_time"]),
-            "ending_time": datetime(*round_["ending_time"]),
+            "beginning_time": self._timestamp(round_["beginning_time"]),
+            "ending_time": self._timestamp(round_["ending_time"]),
         }
         return Round(**clean_kwargs)
 
+    @staticmethod
+    def _timestamp(time_):
+        """ Return a round time as a timestamp. Older databases saved round times as (year, month, day, hour, minute)
+        lists. """
+        if isinstance(time_, list):
+            return int(datetime(*time_).timestamp())
+        return time_
+
     def serialized_match(self, match: Match) -> tuple[list, list]:
         """ Return a serialized version of a Match object. Instead of the player, it's the player UID that is saved.
         """
@@ -447,62 +994,482 @@ class Loader:
 
     def unserialized_match(self, match: dict):
         """ Return a Match object referencing to Players objects from a previously serialized Match. """
-        player_1 = self.players[match[0][0]]
-        player_2 = self.players[match[1][0]]
+        player_1 = self.players_by_uid[match[0][0]]
+        player_2 = self.players_by_uid[match[1][0]]
         score_1 = match[0][1]
         score_2 = match[1][1]
         return Match(player_1, player_2, score_1, score_2)
 
     def save_players(self):
-        """ Saves the self.players list in a .JSON file after serializing objects. """
-        self.db.table("players").truncate()
-        self.db.table("players").insert_multiple([self.serialized_player(player) for player in self.players])
+        """ Saves the self.players list in a .JSON file after serializing objects. The players index is rebuilt, so
+        the tournaments read afterwards can reference the players created or merged since the loading. """
+        self.players_by_uid = {player.uid: player for player in self.players}
+        with self._open(self.players_path) as db:
+            db.table("players").truncate()
+            db.table("players").insert_multiple([self.serialized_player(player) for player in self.players])
+
+    def tournament_header(self, tournament: Tournament) -> dict:
+        """ Return the header of a tournament, saved in the manifest. """
+        b = tournament.beginning_date
+        e = tournament.ending_date
+        return {
+            "uid": tournament.uid,
+            "file": f"tournament_{tournament.uid}.json",
+            "name": tournament.name,
+            "place": tournament.place,
+            "beginning_date": (b.year, b.month, b.day),
+            "ending_date": (e.year, e.month, e.day),
+            "time_control": tournament.time_control,
+            "pairing_system": tournament.pairing_system,
+            "number_of_rounds": len(tournament.rounds),
+            "number_of_players": len(tournament.players),
+            # changed each time the tournament file is written, so the manifest changes with any tournament
+            "version": 0,
+        }
 
-    def save_tournaments(self):
-        """ Saves the self.tournaments list in a .JSON file after serializing objects. """
-        self.db.table("tournaments").truncate()
-        self.db.table("tournaments").insert_multiple([self.serialized_tournament(tournament)
-                                                      for tournament in self.tournaments])
+    def _update_headers(self, tournaments: list):
+        """ Update (or add) the headers of the given tournaments in the manifest, with a single write, and return
+        them. Tournaments saved for the first time are given an UID. """
+        with self._open(self.manifest_path) as manifest:
+            headers = {header["uid"]: header for header in manifest.table("tournaments").all()}
+            for header in headers.values():
+                # players lists were saved in the headers by older versions, they are now in the participations index
+                header.pop("players", None)
+            next_uid = max(headers, default=-1) + 1
+            for tournament in tournaments:
+                if tournament.uid is None:
+                    tournament.uid = next_uid
+                    next_uid += 1
+                header = self.tournament_header(tournament)
+                if tournament.uid in headers:
+                    header["version"] = headers[tournament.uid]["version"] + 1
+                headers[tournament.uid] = header
+            manifest.table("tournaments").truncate()
+            manifest.table("tournaments").insert_multiple(headers.values())
+        return [headers[tournament.uid] for tournament in tournaments]
+
+    def save_tournaments(self, tournaments: list = None):
+        """ Saves the given tournaments (by default, all the tournaments of the self.tournaments list), each one in
+        its own file. The saved corrections of these tournaments are dropped, because they are now included in the
+        saved tournaments. """
+        tournaments = self.tournaments if tournaments is None else tournaments
+        headers = self._update_headers(tournaments)
+        self._update_participations(tournaments)
+        for tournament, header in zip(tournaments, headers):
+            with self._open(self.tournament_path(header)) as db:
+                db.table("tournament").truncate()
+                db.table("tournament").insert(self.serialized_tournament(tournament))
+                # corrections saved in the tournament file by older versions
+                db.table("corrections").truncate()
+            if os.path.exists(self.corrections_path(header)):
+                os.remove(self.corrections_path(header))
+
+    def _update_participations(self, tournaments: list):
+        """ Update the players UIDs of the given tournaments in the participations index. The index is only written
+        when a players list changed. """
+        with self._open(self.participations_path) as db:
+            participations = {document["uid"]: document["players"] for document in db.table("participations").all()}
+            changed = False
+            for tournament in tournaments:
+                players = [player.uid for player in tournament.players]
+                if participations.get(tournament.uid) != players:
+                    participations[tournament.uid] = players
+                    changed = True
+            if changed:
+                db.table("participations").truncate()
+                db.table("participations").insert_multiple(
+                    [{"uid": uid, "players": players} for uid, players in participations.items()])
+
+    def participations(self):
+        """ Return the players UIDs of each saved tournament ({tournament uid: set of players UIDs}), read from the
+        participations index. The tournaments saved by older versions are missing. """
+        try:
+            with self._open(self.participations_path, read_only=True) as db:
+                return {document["uid"]: set(document["players"]) for document in db.table("participations").all()}
+        except (OSError, ValueError):
+            return {}
+
+    def reserve_tournament_uid(self, tournament: Tournament):
+        """ Give an UID to a tournament which is not saved yet, after the UIDs of the saved and loaded tournaments,
+        without writing anything. """
+        uids = [header["uid"] for header in self.tournament_headers()]
+        uids += [loaded_tournament.uid for loaded_tournament in self.tournaments if loaded_tournament.uid is not None]
+        tournament.uid = max(uids, default=-1) + 1
+
+    def save_tournament(self, tournament: Tournament):
+        """ Saves a single tournament in its own file, without writing the other tournaments files. """
+        self.save_tournaments([tournament])
+
+    def save_correction(self, tournament: Tournament, round_index: int, match_index: int):
+        """ Saves a match result correction by appending a line to the corrections journal of the tournament, instead
+        of writing again the tournament file and the manifest. The journal is folded into the tournament file by the
+        next save of the tournament. """
+        if tournament.uid is None:
+            self.save_tournament(tournament)
+            return
+        correction = {
+            "round": round_index,
+            "match": match_index,
+            "scores": list(tournament.rounds[round_index].matches[match_index].scores),
+        }
+        with open(self.corrections_path(self.tournament_header(tournament)), "ab") as journal:
+            journal.write(json.dumps(correction).encode("utf-8") + b"\n")
+
+    def load(self):
+        """ Load players and tournaments saved in previous sessions, if they are not loaded yet. The warm-start
+        snapshot is used when it is up to date with the database, to avoid parsing and unserializing it. """
+        if self.loaded:
+            return
+        if not os.path.exists(self.manifest_path) and os.path.exists(self.legacy_database_path):
+            self.migrate_legacy_database()
+        elif self.players_loaded:
+            # the snapshot would load the players again
+            self.load_tournaments()
+        elif not self.load_snapshot():
+            self.load_players()
+            self.load_tournaments()
+        self.loaded = True
+
+    def migrate_if_needed(self):
+        """ Migrate the legacy database if the sharded database doesn't exist yet, for the actions reading the
+        sharded files directly instead of calling self.load. The migration loads the whole legacy database. """
+        if not os.path.exists(self.manifest_path) and os.path.exists(self.legacy_database_path):
+            self.load()
+
+    def migrate_legacy_database(self):
+        """ Load the players and tournaments from the unsharded database of older versions, and save them in the
+        sharded database. The old database file is kept untouched. """
+        with self._open(self.legacy_database_path) as db:
+            for player in db.table("players").all():
+                self.players.append(self.unserialized_player(player))
+            self._index_players()
+            for tournament in db.table("tournaments").all():
+                self.tournaments.append(self.unserialized_tournament(tournament))
+            for correction in db.table("corrections").all():
+                tournament = self.tournaments[correction["tournament"]]
+                tournament.rounds[correction["round"]].matches[correction["match"]].set_scores(*correction["scores"])
+        self.save_players()
+        self.save_tournaments()
+
+    def _database_checksum(self):
+        """ Return a checksum of the players file and manifest contents, and of the tournaments files sizes and
+        modification times (None if there is no database yet). The tournaments files are not read, but any change
+        to them, even by hand, changes the checksum. """
+        if not (os.path.exists(self.players_path) and os.path.exists(self.manifest_path)):
+            return None
+        checksum = 0
+        for path in (self.players_path, self.manifest_path):
+            with open(path, "rb") as database_file:
+                checksum = zlib.crc32(database_file.read(), checksum)
+        tournaments_directory = join(self.database_directory, "tournaments")
+        if os.path.exists(tournaments_directory):
+            for entry in sorted(os.scandir(tournaments_directory), key=lambda e: e.name):
+                stat = entry.stat()
+                checksum = zlib.crc32(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"), checksum)
+        return checksum
+
+    def save_snapshot(self):
+        """ Saves the loaded players and tournaments in a binary snapshot, tied to the current database content by a
+        checksum. It must be called when the database is up to date, for example when the app is closed. """
+        checksum = self._database_checksum()
+        # the snapshot would hide the unreadable tournaments to the next sessions
+        if not self.loaded or checksum is None or self.unreadable_tournaments:
+            return
+        with open(self.snapshot_path, "wb") as snapshot_file:
+            # players and tournaments are pickled together, so matches keep referencing the same players
+            pickle.dump((checksum, Player.uid, self.players, self.tournaments), snapshot_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_snapshot(self) -> bool:
+        """ Load the players and tournaments from the warm-start snapshot, and return True, if the snapshot exists and
+        matches the current database content. Otherwise, return False without loading anything. """
+        if not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                checksum, player_uid, players, tournaments = pickle.load(snapshot_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError):
+            return False
+        if checksum != self._database_checksum():
+            return False
+        Player.uid = player_uid
+        self.players.extend(players)
+        self.tournaments.extend(tournaments)
+        self.players_by_uid = {player.uid: player for player in self.players}
+        self.players_loaded = True
+        return True
 
     def load_players(self):
         """ Unserialize and reinstanciate saved Players objects from previous sessions.
         /!\\ Should not create any player or tournament, by hand  before the call of this method.
         /!\\ Must be called before self.load_tournaments. """
-        Player.uid = 0
-        for player in self.db.table("players").all():
-            self.players.append(self.unserialized_player(player))
+        with self._open(self.players_path) as db:
+            for player in db.table("players").all():
+                self.players.append(self.unserialized_player(player))
+        self._index_players()
+
+    def _index_players(self):
+        """ Index the loaded players by UID, and set the next Player UID after the greatest loaded one (UIDs are not
+        contiguous once duplicated players have been merged). """
+        self.players_by_uid = {player.uid: player for player in self.players}
+        Player.uid = max(self.players_by_uid, default=-1) + 1
+        self.players_loaded = True
+
+    def tournament_headers(self):
+        """ Return the headers of the saved tournaments, read from the manifest only (an empty list if there is no
+        manifest yet). The manifest is opened read-only, so reading it never creates it, which would prevent the
+        migration of the legacy database. """
+        try:
+            with self._open(self.manifest_path, read_only=True) as manifest:
+                return manifest.table("tournaments").all()
+        except FileNotFoundError:
+            return []
+
+    def _read_tournament(self, header: dict):
+        """ Return the serialized tournament and its saved corrections, read from the tournament file, or None if the
+        file is missing or unreadable (truncated or corrupted). """
+        try:
+            with self._open(self.tournament_path(header), read_only=True) as db:
+                return db.table("tournament").all()[0], db.table("corrections").all() + self._read_corrections(header)
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def _read_corrections(self, header: dict):
+        """ Return the corrections of the journal of a tournament, in the order they were saved. """
+        corrections = []
+        try:
+            journal = open(self.corrections_path(header), "rb")
+        except FileNotFoundError:
+            return corrections
+        with journal:
+            for line in journal:
+                # a line without its end was being written when the app stopped
+                if not line.endswith(b"\n"):
+                    break
+                corrections.append(json.loads(line))
+        return corrections
+
+    def _unserialized_tournament_with_corrections(self, tournament: dict, corrections: list) -> Tournament:
+        """ Return an unserialized tournament, with the corrections saved since its last full save applied. """
+        tournament = self.unserialized_tournament(tournament)
+        for correction in corrections:
+            tournament.rounds[correction["round"]].matches[correction["match"]].set_scores(*correction["scores"])
+        return tournament
+
+    def _tournament_from(self, header: dict, serialized: tuple):
+        """ Return the tournament unserialized from the content of its file, or None if the file could not be read or
+        references unknown players or matches. Such tournaments are kept in self.unreadable_tournaments. """
+        if serialized is not None:
+            try:
+                return self._unserialized_tournament_with_corrections(*serialized)
+            except (KeyError, IndexError, TypeError, ValueError):
+                pass
+        if header not in self.unreadable_tournaments:
+            self.unreadable_tournaments.append(header)
+        return None
+
+    def load_tournament(self, header: dict) -> Tournament:
+        """ Unserialize and reinstanciate a single saved tournament, from its header, without reading the other
+        tournaments files. Return None if the tournament file is unreadable.
+        /!\\ Must be called after self.load_players, because it uses Player.uid to reference Match objects. """
+        return self._tournament_from(header, self._read_tournament(header))
 
     def load_tournaments(self):
-        """ Unserialize and reinstanciate saved Tournaments objects from previous sessions.
+        """ Unserialize and reinstanciate saved Tournaments objects from previous sessions. The tournaments files are
+        read in parallel by a pool of workers, and the unreadable ones are skipped.
         /!\\ Should not create any player or tournament, by hand  before the call of this method.
         /!\\ Must be called after self.load_players, because it uses Player.uid to reference Match objects. """
-        for tournament in self.db.table("tournaments").all():
-            self.tournaments.append(self.unserialized_tournament(tournament))
+        from concurrent.futures import ThreadPoolExecutor
+        headers = self.tournament_headers()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for header, serialized in zip(headers, executor.map(self._read_tournament, headers)):
+                tournament = self._tournament_from(header, serialized)
+                if tournament is not None:
+                    self.tournaments.append(tournament)
+
+
+class TournamentQuery:
+    """ A lazy query over the saved tournaments, which generates its records one by one, so the archive is never
+    entirely loaded and a query can be stopped at any time. Filters are chained, for example:
+    TournamentQuery(loader).at("Paris").with_player(12).records("name", "beginning_date").
+    Filters on dates, place and time control are applied on the manifest headers, and filters on players on the
+    participations index, so only the files of the matching tournaments are read, and only when the requested fields
+    are not in the headers. """
+    def __init__(self, loader: Loader):
+        """ The class initiator. It needs the Loader of the database to query. """
+        self.loader = loader
+        self.header_filters = []
+        self.player_uids = []
+        self.tournament_filters = []
+
+    def between(self, beginning: date = None, ending: date = None):
+        """ Keep the tournaments which began and ended between the given dates (included). """
+        if beginning is not None:
+            self.header_filters.append(lambda header: date(*header["beginning_date"]) >= beginning)
+        if ending is not None:
+            self.header_filters.append(lambda header: date(*header["ending_date"]) <= ending)
+        return self
+
+    def at(self, place: str):
+        """ Keep the tournaments which took place at the given place. """
+        self.header_filters.append(lambda header: header["place"] == place)
+        return self
+
+    def with_time_control(self, time_control: str):
+        """ Keep the tournaments with the given time control. """
+        self.header_filters.append(lambda header: header["time_control"] == time_control)
+        return self
+
+    def with_player(self, uid: int):
+        """ Keep the tournaments in which the given player played. """
+        self.player_uids.append(uid)
+        return self
+
+    def where(self, predicate):
+        """ Keep the tournaments for which the given function returns True. As it needs the Tournament instances,
+        this filter reads the tournaments files. """
+        self.tournament_filters.append(predicate)
+        return self
+
+    def _plays(self, player_uids) -> bool:
+        """ Return True if all the players filtered by TournamentQuery.with_player are in the given UIDs. """
+        return all(uid in player_uids for uid in self.player_uids)
+
+    def _headers(self):
+        """ Generate the headers matching the headers filters, each one with True if the players filters could be
+        checked in the participations index, or False if the tournament must be loaded to check them. """
+        participations = self.loader.participations() if self.player_uids else {}
+        for header in self.loader.tournament_headers():
+            if not all(header_filter(header) for header_filter in self.header_filters):
+                continue
+            if not self.player_uids:
+                yield header, True
+            elif header["uid"] in participations:
+                if self._plays(participations[header["uid"]]):
+                    yield header, True
+            else:
+                yield header, False
+
+    def headers(self):
+        """ Generate the headers of the matching tournaments. The headers of tournaments missing from the
+        participations index are also generated when players are filtered: TournamentQuery.tournaments checks them
+        once loaded. """
+        for header, _ in self._headers():
+            yield header
+
+    def _load(self, header: dict):
+        """ Return the tournament of a header if it matches the filters which need it loaded, else None. """
+        if not self.loader.players_loaded:
+            self.loader.load_players()
+        tournament = self.loader.load_tournament(header)
+        if tournament is not None and self._plays({player.uid for player in tournament.players}) \
+                and all(tournament_filter(tournament) for tournament_filter in self.tournament_filters):
+            return tournament
+        return None
+
+    def tournaments(self):
+        """ Generate the matching Tournament instances, reading only the matching tournaments files. """
+        for header in self.headers():
+            tournament = self._load(header)
+            if tournament is not None:
+                yield tournament
+
+    def records(self, *fields):
+        """ Generate a dict of the given fields for each matching tournament. When the fields and the filters only
+        need the headers and the participations index, no tournament file is read. """
+        for header, players_checked in self._headers():
+            if players_checked and not self.tournament_filters and all(field in header for field in fields):
+                yield {field: self._header_value(header, field) for field in fields}
+                continue
+            tournament = self._load(header)
+            if tournament is not None:
+                yield {field: self._value(tournament, field) for field in fields}
+
+    @staticmethod
+    def _header_value(header: dict, field: str):
+        """ Return a field value read in a header, with dates as date objects. """
+        if field in ("beginning_date", "ending_date"):
+            return date(*header[field])
+        return header[field]
+
+    @staticmethod
+    def _value(tournament: Tournament, field: str):
+        """ Return a field value read in a Tournament instance, with players and rounds counted like in headers. """
+        if field == "players":
+            return [player.uid for player in tournament.players]
+        if field in ("number_of_rounds", "number_of_players"):
+            return len(tournament.rounds if field == "number_of_rounds" else tournament.players)
+        return getattr(tournament, field)
+
+    def summarize(self, averaged: tuple = (), counted_by: tuple = ()):
+        """ Return, computed in a single pass over the matching tournaments, their number, the average of each
+        averaged field ({field: average}, None if nothing matches), and their number for each value of each
+        counted_by field ({field: {value: number}}). """
+        number = 0
+        totals = dict.fromkeys(averaged, 0)
+        counts = {field: {} for field in counted_by}
+        for record in self.records(*dict.fromkeys(("uid",) + tuple(averaged) + tuple(counted_by))):
+            number += 1
+            for field in averaged:
+                totals[field] += record[field]
+            for field in counted_by:
+                counts[field][record[field]] = counts[field].get(record[field], 0) + 1
+        return number, {field: total / number if number else None for field, total in totals.items()}, counts
+
+    def count(self):
+        """ Return the number of matching tournaments. """
+        return self.summarize()[0]
+
+    def average(self, field: str):
+        """ Return the average of a numerical field over the matching tournaments (None if nothing matches). """
+        return self.summarize(averaged=(field,))[1][field]
+
+    def count_by(self, field: str):
+        """ Return the number of matching tournaments for each value of a field ({value: number}). """
+        return self.summarize(counted_by=(field,))[2][field]
 
 
 class MainController:
     """ The main controller managing and calling the other subcontrollers. """
-    def __init__(self):
-        """ The class initiator. """
+    def __init__(self, started_at: float = None):
+        """ The class initiator. If started_at (a time.perf_counter value) is given, the startup time is displayed
+        with the first menu. """
         # attributes
+        self.started_at = started_at
         self.players = []
         self.tournaments = []
         # views initialisation
         self.view = View()
         self.player_view = PlayerView()
         self.tournament_view = TournamentView()
+        self.report_view = ReportView()
         # creation controller initialisation
-        self.player_creator = PlayerCreator(self.player_view)
+        self.player_creator = PlayerCreator(self.player_view, self.players)
         self.tournament_creator = TournamentCreator(self.tournament_view)
-        # db initialisation
+        # db initialisation, the data is only loaded by the first action which needs it
         self.loader = Loader(self.players, self.tournaments)
-        self.loader.load_players()
-        self.loader.load_tournaments()
+        bus.open(self.loader.events_path)
+        self._rank_index = None
+
+    @property
+    def rank_index(self):
+        """ Return the index of the players sorted by rank, built on the first call. """
+        if self._rank_index is None:
+            self._rank_index = RankIndex(self.players)
+        return self._rank_index
 
     def run(self):
         """ A method to execute the controller and its menu. """
         running = True
+        # number of unreadable tournaments files the user has already been warned about
+        reported_unreadable = 0
         while running:
+            if self.started_at is not None:
+                startup_time = perf_counter() - self.started_at
+                self.view.display_message(f"Démarrage en {startup_time * 1000:.0f} ms "
+                                          f"(budget : {STARTUP_BUDGET * 1000:.0f} ms)"
+                                          f"{' -> budget dépassé !' * (startup_time > STARTUP_BUDGET)}")
+                self.started_at = None
             action = self.tournament_view.enter_information(
                 "\n--------------------------------------------------------"
                 "\nVoulez-vous :"
@@ -510,19 +1477,37 @@ class MainController:
                 "\n 2 - Créer, exécuter et sauvegarder un tournoi ?"
                 "\n 3 - Consulter la liste des joueurs ou des tournois ?"
                 "\n 4 - Modifier le classement d'un joueur ?"
-                "\n 5 - Quitter."
+                "\n 5 - Corriger le résultat d'un match ?"
+                "\n 6 - Synchroniser les classements avec une liste officielle ?"
+                "\n 7 - Exporter les rapports des tournois ?"
+                "\n 8 - Détecter et fusionner les joueurs en double ?"
+                "\n 9 - Quitter."
                 "\n"
             )
+            # the reports and exports load the data themselves, only when they need it
+            if action in ("1", "2", "4", "5", "6", "8"):
+                self.loader.load()
 
             if action == "1":
-                self.players.append(self.player_creator.run())
-                self.loader.save_players()
+                player = self.player_creator.run()
+                if player in self.players:
+                    self.view.display_message(f"{player} est déjà enregistré.")
+                else:
+                    self.players.append(player)
+                    self.rank_index.add(player)
+                    self.loader.save_players()
 
             elif action == "2":
-                self.tournaments.append(self.tournament_creator.run())
-                TournamentRunner(self.tournament_view, self.tournaments[-1], self.player_creator, self.players).run()
+                number_of_players = len(self.players)
+                tournament = self.tournament_creator.run()
+                # the UID identifies the tournament in the published events, the tournament is only saved once played
+                self.loader.reserve_tournament_uid(tournament)
+                TournamentRunner(self.tournament_view, tournament, self.player_creator, self.players).run()
+                self.tournaments.append(tournament)
+                for player in self.players[number_of_players:]:
+                    self.rank_index.add(player)
                 self.loader.save_players()
-                self.loader.save_tournaments()
+                self.loader.save_tournament(tournament)
                 running = True
 
             elif action == "3":
@@ -535,11 +1520,40 @@ class MainController:
                 running = True
 
             elif action == "5":
+                self.correct_result()
+                running = True
+
+            elif action == "6":
+                if RankingSynchronizer(self.player_view, self.players, self.rank_index).run():
+                    self.loader.save_players()
+                running = True
+
+            elif action == "7":
+                self.export_reports()
+                running = True
+
+            elif action == "8":
+                modified_tournaments = DuplicateMerger(self.player_view, self.players, self.tournaments,
+                                                       self.player_creator.duplicate_index, self.rank_index).run()
+                if modified_tournaments is not None:
+                    self.loader.save_players()
+                    self.loader.save_tournaments(modified_tournaments)
+                running = True
+
+            elif action == "9":
+                self.loader.save_snapshot()
+                bus.close()
                 running = False
 
             else:
                 running = True
 
+            # warned after the action, so the warning isn't cleared by the reports
+            if len(self.loader.unreadable_tournaments) > reported_unreadable:
+                self.tournament_view.display_unreadable_tournaments(
+                    self.loader.unreadable_tournaments[reported_unreadable:])
+                reported_unreadable = len(self.loader.unreadable_tournaments)
+
     def modify_rank(self):
         """ A method to control a player rank modification. """
         if len(self.players) == 0:
@@ -549,12 +1563,76 @@ class MainController:
             rank = None
             while rank is None:
                 rank = self.player_creator.get_rank()
-            player.rank = rank
+            old_rank = player.rank
+            self.rank_index.update(player, rank)
+            bus.publish("rank_changed", uid=player.uid, old_rank=old_rank, rank=rank)
             self.view.display_message(f"{player.first_name} {player.last_name} est maintenant classé"
                                       f"{'-' * (player.gender == 'Autre')}"
                                       f"{'e' * (player.gender in ('Femme', 'Autre'))} "
                                       f"{player.rank}e.")
 
+    def export_reports(self):
+        """ A method to export the reports of one or all the tournaments, in the 'exports' directory. The export of all
+        the tournaments doesn't load them all: they are read one by one, unless they are already loaded. """
+        exporter = TournamentExporter(self.report_view, join(dirname(dirname(abspath(__file__))), "exports"),
+                                      self.loader)
+        choice = ""
+        while choice not in ("1", "2"):
+            choice = self.report_view.enter_export_choice()
+        if choice == "1":
+            self.loader.load()
+            if len(self.tournaments) == 0:
+                self.view.display_message("Aucun tournoi pour le moment.")
+                return
+            directory = exporter.export(self.select_tournament())
+        else:
+            self.loader.migrate_if_needed()
+            headers = self.loader.tournament_headers()
+            if len(headers) == 0:
+                self.view.display_message("Aucun tournoi pour le moment.")
+                return
+            if not self.loader.players_loaded:
+                self.loader.load_players()
+            exporter.export_all(headers)
+            directory = exporter.directory
+        self.view.display_message(f"Rapports exportés dans {directory}.")
+
+    def correct_result(self):
+        """ A method to control a match result correction, in a round of a saved tournament. """
+        if not any(tournament.rounds for tournament in self.tournaments):
+            self.view.display_message("Aucun tournoi joué pour le moment.")
+            return
+        tournament = self.select_tournament()
+        if not tournament.rounds:
+            self.view.display_message("Ce tournoi n'a aucun round.")
+            return
+        round_index = self.select_index([round_.name for round_ in tournament.rounds], "Sélectionner un round")
+        matches = tournament.rounds[round_index].matches
+        match_index = self.select_index([match.__repr__() for match in matches], "Sélectionner un match")
+        winner_number = ""
+        while winner_number not in RESULTS:
+            winner_number = self.tournament_view.enter_match_result(history=False)
+        tournament.set_result(round_index, match_index, RESULTS[winner_number])
+        self.loader.save_correction(tournament, round_index, match_index)
+        publish_result(tournament, round_index, match_index)
+        # the standings are recomputed from the corrected round onward
+        scores = tournament.history.scores(tournament.rounds)
+        message = f"Scores après correction de {tournament.rounds[round_index].name}"
+        for player in sorted(tournament.players, key=lambda p: scores.get(p.uid, 0), reverse=True):
+            message += f"\n {player} -> score: {scores.get(player.uid, 0)} "
+        self.view.display_message(message)
+
+    def select_index(self, choices: list, message: str):
+        """ This method let the user chose an item in a list of strings, and return its index.
+        /!\\ This method must not be called with an empty list. """
+        number_of_choices = len(choices)
+        choice_range = ""
+        while not(choice_range.isdecimal() and choice_range != "0" and int(choice_range) <= number_of_choices):
+            for index, choice in enumerate(choices, 1):
+                self.view.display_message(f" {index} - {choice}")
+            choice_range = self.view.enter_information(f"{message} (1-{number_of_choices}).")
+        return int(choice_range) - 1
+
     def select_player(self):
         """ This method let the user chose a player on which to do actions.
         /!\\ This method must not be called when self.players is empty. """
@@ -588,15 +1666,21 @@ class MainController:
             "\n 5 - Les tournois ?"
             "\n 6 - Les tours d'un tournoi ?"
             "\n 7 - Les matchs d'un tournoi ?"
+            "\n 8 - Les statistiques des tournois ?"
             "\n"
         )
         self.view.clear()
+        # the statistics only read the manifest, the other reports need the players and tournaments loaded
+        if action == "8":
+            self.tournament_statistics()
+            return
+        self.loader.load()
         if action == "1":
             "Liste des joueurs, triés par nom :"
             self.player_view.list_players(sorted(self.players, key=lambda p: p.first_name))
         elif action == "2":
             "Liste des joueurs, triés par classement :"
-            self.player_view.list_players(sorted(self.players, key=lambda p: p.rank))
+            self.player_view.list_players(self.rank_index)
         elif action == "3":
             if self.tournaments:
                 self.player_view.list_players(sorted(self.select_tournament().players, key=lambda p: p.first_name))
@@ -612,6 +1696,14 @@ class MainController:
             if self.tournaments:
                 self.tournament_view.list_matches(self.select_tournament())
 
+    def tournament_statistics(self):
+        """ A method to display statistics on the saved tournaments, computed in a single pass over the manifest. """
+        self.loader.migrate_if_needed()
+        number, averages, counts = TournamentQuery(self.loader).summarize(
+            averaged=("number_of_rounds", "number_of_players"), counted_by=("place", "time_control"))
+        self.tournament_view.list_statistics(number, averages["number_of_rounds"], averages["number_of_players"],
+                                             counts["place"], counts["time_control"])
+
 
 # execution ----------------------------------------------------------------------------------------------------------
 if __name__ == '__main__':
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+
+# imports ------------------------------------------------------------------------------------------------------------
+# python standard library imports
+import json
+import os
+from os.path import dirname
+from queue import Queue
+from threading import Thread
+from time import time
+
+# outside libraries imports
+# local imports
+
+
+# events classes -----------------------------------------------------------------------------------------------------
+class EventBus:
+    """ An internal bus publishing the models mutations (player created, rank changed, round generated, result
+    entered, round closed...). Each event is a dict with a 'type' and a 'time' (timestamp), and is appended to a
+    local log, with one JSON event per line, so external systems can read the events from any offset.
+    Publishing only puts the event in a queue: a worker thread writes the log and calls the subscribers, so the
+    publisher never waits for them. """
+    def __init__(self, path: str = None):
+        """ The class initiator. Events are only logged when a log path is given (see EventBus.open). """
+        self.path = path
+        self.subscribers = []
+        self.queue = Queue()
+        self.worker = None
+
+    def open(self, path: str):
+        """ Set the path of the events log, and create its directory if needed. """
+        if not os.path.exists(dirname(path)):
+            os.makedirs(dirname(path))
+        self.path = path
+
+    def subscribe(self, callback):
+        """ Add a subscriber, called by the worker thread with (offset, event) for each event. The offset is the
+        position of the next event in the log, from which a subscriber can resume with EventBus.tail. """
+        self.subscribers.append(callback)
+
+    def publish(self, event_type: str, **data):
+        """ Publish an event, without waiting for it to be logged and sent to the subscribers. """
+        if self.path is None and not self.subscribers:
+            return
+        if self.worker is None:
+            self.worker = Thread(target=self._work, daemon=True)
+            self.worker.start()
+        self.queue.put({"type": event_type, "time": int(time()), **data})
+
+    def _work(self):
+        """ Log the published events and send them to the subscribers, until EventBus.close is called. """
+        offset = 0
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            if self.path is not None:
+                with open(self.path, "ab") as log_file:
+                    log_file.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                    offset = log_file.tell()
+            for callback in self.subscribers:
+                try:
+                    callback(offset, event)
+                except Exception:
+                    # a failing subscriber must not stop the log, nor the other subscribers
+                    pass
+
+    def close(self):
+        """ Wait until all the published events are logged and sent, and stop the worker thread. """
+        if self.worker is not None:
+            self.queue.put(None)
+            self.worker.join()
+            self.worker = None
+
+    def tail(self, offset: int = 0):
+        """ Generate the logged events from the given offset, as (next offset, event) tuples: the next offset is
+        the one to give to resume reading after this event. """
+        if self.path is None:
+            return
+        try:
+            log_file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with log_file:
+            log_file.seek(offset)
+            for line in log_file:
+                # a line without its end is still being written
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                yield offset, json.loads(line)
+
+
+# the bus used by the models and the controllers
+bus = EventBus()
+
+
+# execution ----------------------------------------------------------------------------------------------------------
+if __name__ == '__main__':
+    pass
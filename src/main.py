@@ -4,12 +4,17 @@
 
 # imports ------------------------------------------------------------------------------------------------------------
 # python standard library imports
+import sys
+from time import perf_counter
+STARTED_AT = perf_counter()
+
 # outside libraries imports
 # local imports
-from controllers import MainController
+from controllers import MainController  # noqa: E402
 
 
 # execution ----------------------------------------------------------------------------------------------------------
 if __name__ == '__main__':
-    controller = MainController()
+    # 'python src/main.py --startup-time' displays the time needed to reach the main menu
+    controller = MainController(STARTED_AT if "--startup-time" in sys.argv else None)
     controller.run()
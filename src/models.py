@@ -3,12 +3,19 @@
 
 
 # python standard library imports
-from datetime import date, datetime
+import bisect
+import heapq
+import unicodedata
+from datetime import date
+from difflib import SequenceMatcher
+from functools import lru_cache
+from time import time
 from typing import List
 
 
 # outside libraries imports
 # local imports
+from events import bus
 
 
 class Player:
@@ -44,6 +51,143 @@ class Player:
         return f"{self.first_name} {self.last_name}, {self.rank}e"
 
 
+class RankIndex:
+    """ The model used to keep players sorted by rank. Rank changes update the index in place, instead of sorting
+    again all the players. """
+
+    def __init__(self, players: list):
+        """ The RankIndex class initiator. """
+        self.players = {player.uid: player for player in players}
+        self.keys = sorted((player.rank, player.uid) for player in players)
+
+    def __iter__(self):
+        """ Iterate over the players, sorted by rank. """
+        return (self.players[uid] for rank, uid in self.keys)
+
+    def __len__(self):
+        """ Return the number of indexed players. """
+        return len(self.keys)
+
+    def add(self, player: Player):
+        """ Add a player to the index, unless it is already indexed (the index can be built after the player was added
+        to the players list). """
+        if player.uid in self.players:
+            return
+        self.players[player.uid] = player
+        bisect.insort(self.keys, (player.rank, player.uid))
+
+    def remove_many(self, uids: set):
+        """ Remove several players from the index (by UID), with a single pass over the sorted keys. """
+        self.keys = [key for key in self.keys if key[1] not in uids]
+        for uid in uids:
+            self.players.pop(uid, None)
+
+    def update(self, player: Player, rank: int):
+        """ Set the rank of a player and move it in the index. """
+        del self.keys[bisect.bisect_left(self.keys, (player.rank, player.uid))]
+        player.rank = rank
+        bisect.insort(self.keys, (rank, player.uid))
+
+    def update_many(self, ranks: dict):
+        """ Set the ranks of several players ({player uid: rank}). Only the changed keys are sorted, and then merged
+        with the unchanged ones (which are still sorted). """
+        kept_keys = [key for key in self.keys if key[1] not in ranks]
+        for uid, rank in ranks.items():
+            self.players[uid].rank = rank
+        self.keys = list(heapq.merge(kept_keys, sorted((rank, uid) for uid, rank in ranks.items())))
+
+
+class DuplicateIndex:
+    """ The model used to find likely duplicated players. Players are grouped in blocks by birth date and initials, so
+    a lookup only compares the names of the players born the same day, with the same initials. Names are compared once
+    normalized (lower case, without accents nor separators), and are similar if they are equal or close enough, even
+    with first and last names swapped. """
+    similarity_threshold = 0.85
+
+    def __init__(self, players: list):
+        """ The DuplicateIndex class initiator. """
+        self.blocks = {}
+        for player in players:
+            self.add(player)
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def normalized(name: str):
+        """ Return a name in lower case, without accents, spaces, <-> or <'> symbols. """
+        decomposed_name = unicodedata.normalize("NFKD", name.lower())
+        return "".join(caracter for caracter in decomposed_name if caracter.isalpha())
+
+    def _key(self, first_name: str, last_name: str):
+        """ Return the normalized (first name, last name) key of a player. """
+        return self.normalized(first_name), self.normalized(last_name)
+
+    @staticmethod
+    def _block(key: tuple, birth_date: date):
+        """ Return the block of a player, from its normalized names key and its birth date. Initials are sorted, so
+        swapped first and last names are in the same block. """
+        return (birth_date,) + tuple(sorted(name[:1] for name in key))
+
+    def _matcher(self, key: tuple):
+        """ Return a function telling if a normalized names key is similar to the given one. The compared name is
+        prepared once, and the costly similarity ratio is only computed when the quick upper bounds reach the
+        threshold. """
+        matcher = SequenceMatcher(None, "", " ".join(key))
+        threshold = self.similarity_threshold
+
+        def is_similar(other_key: tuple):
+            """ Return True if the given key is likely the same person's. """
+            if key == other_key or key == other_key[::-1]:
+                return True
+            for other in (other_key, other_key[::-1]):
+                matcher.set_seq1(" ".join(other))
+                if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold \
+                        and matcher.ratio() >= threshold:
+                    return True
+            return False
+        return is_similar
+
+    def add(self, player: Player):
+        """ Add a player to the index. """
+        key = self._key(player.first_name, player.last_name)
+        self.blocks.setdefault(self._block(key, player.birth_date), []).append((key, player))
+
+    def remove_many(self, players: list):
+        """ Remove several players from the index, with a single pass over each of their blocks. """
+        removed_by_block = {}
+        for player in players:
+            block = self._block(self._key(player.first_name, player.last_name), player.birth_date)
+            removed_by_block.setdefault(block, set()).add(id(player))
+        for block, removed in removed_by_block.items():
+            if block in self.blocks:
+                self.blocks[block] = [(key, player) for key, player in self.blocks[block] if id(player) not in removed]
+
+    def similar(self, first_name: str, last_name: str, birth_date: date):
+        """ Return the indexed players likely to be the same person as the given one. """
+        key = self._key(first_name, last_name)
+        is_similar = self._matcher(key)
+        return [player for other_key, player in self.blocks.get(self._block(key, birth_date), [])
+                if is_similar(other_key)]
+
+    def groups(self):
+        """ Generate the groups of indexed players likely to be the same person, each group sorted by UID. """
+        for block in self.blocks.values():
+            if len(block) < 2:
+                continue
+            # each player joins the group of the first similar player met before it
+            groups = []
+            for key, player in block:
+                is_similar = self._matcher(key)
+                for group_key, group in groups:
+                    if is_similar(group_key):
+                        group.append(player)
+                        break
+                else:
+                    groups.append((key, [player]))
+            for _, group in groups:
+                if len(group) > 1:
+                    yield sorted(group, key=lambda p: p.uid)
+
+
 class Match(tuple):
     """ The model used to stock matches information. """
 
@@ -51,6 +195,10 @@ class Match(tuple):
         """ The Match class constructor. """
         return super(Match, cls).__new__(cls, tuple([[player_1, score_1], [player_2, score_2]]))
 
+    def __getnewargs__(self):
+        """ Return the arguments given to __new__ when a Match is unpickled. """
+        return self.p1, self.p2, self.s1, self.s2
+
     def __repr__(self):
         """ __repr__ overloading. """
         return f"< {self.p1.first_name} {self.p1.last_name} : {self.s1}pt\t"\
@@ -76,16 +224,28 @@ class Match(tuple):
         """ Return the player 2 score. """
         return self[1][1]
 
+    @property
+    def scores(self):
+        """ Return both players scores, as an immutable snapshot. """
+        return self[0][1], self[1][1]
+
+    def set_scores(self, score_1, score_2):
+        """ Set both players scores. """
+        self[0][1] = score_1
+        self[1][1] = score_2
+
 
 class Round:
-    """ The model used to stock rounds information. """
+    """ The model used to stock rounds information. Beginning and ending times are stocked as timestamps (integer
+    numbers of seconds), which are only converted to dates by the views. """
+    __slots__ = ("name", "matches", "beginning_time", "ending_time")
 
     def __init__(
             self,
             name: str,
             matches: List[Match],
-            beginning_time=None,
-            ending_time=None,
+            beginning_time: int = None,
+            ending_time: int = None,
 
     ):
         """ The round class initiator. """
@@ -94,12 +254,15 @@ class Round:
         if beginning_time is not None:
             self.beginning_time = beginning_time
         else:
-            self.beginning_time = datetime.now()
+            self.beginning_time = int(time())
         self.ending_time = ending_time
 
-    def close(self):
-        """ The method used to finish a round, auto-report the ending time."""
-        self.ending_time = datetime.now()
+    def close(self, tournament_uid: int = None, round_index: int = None):
+        """ The method used to finish a round, auto-report the ending time. The tournament UID and the round index
+        identify the round in the published event."""
+        self.ending_time = int(time())
+        bus.publish("round_closed", tournament=tournament_uid, round=round_index, name=self.name,
+                    ending_time=self.ending_time)
 
     def __repr__(self):
         """ Repr overloading. """
@@ -109,6 +272,68 @@ class Round:
         return string
 
 
+class ResultHistory:
+    """ The model used to stock the results history of a tournament, to undo, redo or correct results.
+    Each entered result is kept as an immutable (round index, match index, scores before, scores after) change, and
+    the standings are snapshotted after each round. A change only invalidates the standings from its round onward,
+    the previous snapshots are shared and never recomputed. """
+
+    def __init__(self):
+        """ The ResultHistory class initiator. """
+        self.changes = []
+        self.cursor = 0
+        self.standings = []
+
+    def record(self, round_index: int, match_index: int, before: tuple, after: tuple):
+        """ Record a result change. Changes which were undone can't be redone anymore. """
+        del self.changes[self.cursor:]
+        self.changes.append((round_index, match_index, before, after))
+        self.cursor += 1
+        self.invalidate(round_index)
+
+    def undo(self, rounds: list):
+        """ Cancel the last result change and return it (None if there is nothing to undo). """
+        if self.cursor == 0:
+            return None
+        self.cursor -= 1
+        round_index, match_index, before, after = change = self.changes[self.cursor]
+        rounds[round_index].matches[match_index].set_scores(*before)
+        self.invalidate(round_index)
+        return change
+
+    def redo(self, rounds: list):
+        """ Apply again the last undone result change and return it (None if there is nothing to redo). """
+        if self.cursor == len(self.changes):
+            return None
+        round_index, match_index, before, after = change = self.changes[self.cursor]
+        self.cursor += 1
+        rounds[round_index].matches[match_index].set_scores(*after)
+        self.invalidate(round_index)
+        return change
+
+    def next_change(self):
+        """ Return the change which would be applied by a redo (None if there is nothing to redo). """
+        if self.cursor == len(self.changes):
+            return None
+        return self.changes[self.cursor]
+
+    def invalidate(self, round_index: int):
+        """ Forget the standings snapshots from the given round onward. """
+        del self.standings[round_index:]
+
+    def scores(self, rounds: list) -> dict:
+        """ Return the cumulative scores ({player uid: score}) after the given rounds. Only the rounds following the
+        last valid standings snapshot are summed. """
+        del self.standings[len(rounds):]
+        for round_ in rounds[len(self.standings):]:
+            scores = dict(self.standings[-1]) if self.standings else {}
+            for match in round_.matches:
+                scores[match.p1.uid] = scores.get(match.p1.uid, 0) + match.s1
+                scores[match.p2.uid] = scores.get(match.p2.uid, 0) + match.s2
+            self.standings.append(scores)
+        return self.standings[-1] if self.standings else {}
+
+
 class Tournament:
     """ The model used to stock tournament information. """
 
@@ -124,6 +349,9 @@ class Tournament:
             players=[],
             ending_date: date = None,
             rounds=[],
+            pairing_system: str = "Suisse",
+            schedule=None,
+            uid: int = None,
     ):
         """ The tournament initiator. """
         self.name = name
@@ -141,6 +369,19 @@ class Tournament:
             self.ending_date = beginning_date
         else:
             self.ending_date = ending_date
+        self.history = ResultHistory()
+        # pairing system and its precomputed schedule (None for the swiss system, computed round after round)
+        self.pairing_system = pairing_system
+        self.schedule = schedule
+        # identifier of the tournament in the database, given when it is saved for the first time
+        self.uid = uid
+
+    def set_result(self, round_index: int, match_index: int, scores: tuple):
+        """ Set the scores of a match and record the change in the tournament history. """
+        match = self.rounds[round_index].matches[match_index]
+        before = match.scores
+        match.set_scores(*scores)
+        self.history.record(round_index, match_index, before, tuple(scores))
 
     def __repr__(self):
         """ Repr overloading. """
@@ -5,6 +5,9 @@
 # imports ------------------------------------------------------------------------------------------------------------
 # python standard library imports
 import os
+import csv
+from datetime import datetime
+from html import escape
 
 # outside libraries imports
 # local imports
@@ -51,6 +54,46 @@ class PlayerView(View):
         """ A method to get the player rank. """
         return self.enter_information("Classement : ")
 
+    def enter_duplicate_choice(self, similar_players: list):
+        """ A method to chose between a new player and similar known players. """
+        self.display_message("Des joueurs similaires sont déjà enregistrés :")
+        self.list_players(similar_players, show_index=True)
+        return self.enter_information(f"Sélectionner le joueur existant (1-{len(similar_players)}), "
+                                      f"ou '0' pour créer quand même un nouveau joueur.")
+
+    def enter_merge_confirmation(self, groups: list):
+        """ A method to confirm the merge of groups of duplicated players (the first one of each group is kept). """
+        for group in groups:
+            self.display_message(f"{group[0].first_name} {group[0].last_name} ({group[0].birth_date}), "
+                                 f"{group[0].rank}e <- "
+                                 + ", ".join(f"{player.first_name} {player.last_name}" for player in group[1:]))
+        return self.enter_information(f"Fusionner ces {len(groups)} groupe{'s' * (len(groups) > 1)} de joueurs ? "
+                                      f"('o' pour oui, 'n' pour non)")
+
+    def enter_ranking_file_path(self):
+        """ A method to get the path of an official ranking file. """
+        return self.enter_information("Chemin du fichier de classement (CSV avec les colonnes 'uid' ou 'first_name', "
+                                      "'last_name' et 'birth_date', puis 'rank') : ")
+
+    def display_ranking_sync_summary(self, changes: list, unchanged: int, unknown: list, invalid: list):
+        """ A method to display the summary of a ranking synchronization. Changes are (player, old rank, new rank)
+        tuples, unknown and invalid are lists of line numbers. """
+        self.display_message(f"{len(changes)} classement{'s' * (len(changes) > 1)} modifié"
+                             f"{'s' * (len(changes) > 1)}, {unchanged} inchangé{'s' * (unchanged > 1)}.")
+        for player, old_rank, new_rank in changes[:20]:
+            self.display_message(f" {player.first_name} {player.last_name} ({player.birth_date}) : "
+                                 f"{old_rank}e -> {new_rank}e")
+        if len(changes) > 20:
+            self.display_message(f" ... et {len(changes) - 20} autres.")
+        if unknown:
+            plural = "s" * (len(unknown) > 1)
+            self.display_message(f"{len(unknown)} joueur{plural} inconnu{plural} (ligne{plural} "
+                                 f"{', '.join(map(str, unknown[:20]))}{', ...' * (len(unknown) > 20)}).")
+        if invalid:
+            plural = "s" * (len(invalid) > 1)
+            self.display_message(f"{len(invalid)} ligne{plural} invalide{plural} (ligne{plural} "
+                                 f"{', '.join(map(str, invalid[:20]))}{', ...' * (len(invalid) > 20)}).")
+
     @staticmethod
     def list_players(players, show_index: bool = False):
         """ A method to display a list of players. """
@@ -89,6 +132,11 @@ class TournamentView(View):
         """ A method to get the tournament time control. """
         return self.enter_information("Gestion du temps ('blitz', 'bullet' ou 'coup rapide') : ")
 
+    def enter_pairing_system(self):
+        """ A method to get the tournament pairing system. """
+        return self.enter_information("Système d'appariement ('suisse', 'toutes rondes' ou 'coupe', "
+                                      "suisse par défaut) : ")
+
     def enter_number_of_rounds(self):
         """ A method to get the tournament number of rounds. """
         return self.enter_information("Nombre de rounds (4 par défaut) : ")
@@ -105,9 +153,13 @@ class TournamentView(View):
         """ A method to get a tournament round name. """
         return self.enter_information("\nNom du nouveau round : ")
 
-    def enter_match_result(self):
-        """ A method to get a match result. """
-        return self.enter_information("Gagnant du match ('1' pour J1, '2' pour J2 ou '0' en cas de match nul) : ")
+    def enter_match_result(self, history: bool = True):
+        """ A method to get a match result. If history is True, the undo and redo commands are also proposed. """
+        if not history:
+            return self.enter_information("Gagnant du match ('1' pour J1, '2' pour J2 ou '0' en cas de match nul) : ")
+        return self.enter_information("Gagnant du match ('1' pour J1, '2' pour J2 ou '0' en cas de match nul, "
+                                      "'/annuler' pour revenir au match précédent, '/retablir' pour rétablir le "
+                                      "résultat annulé) : ")
 
     def list_tournaments(self, tournaments, show_index: bool = False):
         """ A method to display a list of tournaments. """
@@ -123,15 +175,92 @@ class TournamentView(View):
                                      f"({tournament.beginning_date} - {tournament.ending_date})")
 
     def list_rounds(self, tournament):
+        """ A method to display the rounds of a tournament. """
         for round_ in tournament.rounds:
-            self.display_message(round_.__repr__())
+            self.display_message(f"{round_.__repr__()}\n Début : {self.format_time(round_.beginning_time)}"
+                                 f", fin : {self.format_time(round_.ending_time)}")
+
+    @staticmethod
+    def format_time(timestamp: int):
+        """ A method to convert a round timestamp into a displayable date and time. """
+        if timestamp is None:
+            return "en cours"
+        return datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M")
+
+    def display_unreadable_tournaments(self, headers: list):
+        """ A method to warn the user about the tournaments whose file could not be read. """
+        plural = "s" * (len(headers) > 1)
+        self.display_message(f"{len(headers)} tournoi{plural} illisible{plural}, ignoré{plural} :")
+        for header in headers:
+            self.display_message(f" {header['name']}, {header['place']} (fichier {header['file']})")
 
     def list_matches(self, tournament):
+        """ A method to display the matches of a tournament. """
         for round_ in tournament.rounds:
-            counter = 0
             for match in round_.matches:
-                self.display_message(f"{match.p1} ({match.s1}) - ({match.s2}) {match.p2}",
-                                     end="\n" * (counter % 3 == 0))
+                self.display_message(f"{match.p1} ({match.s1}) - ({match.s2}) {match.p2}")
+
+    def list_statistics(self, number: int, rounds: float, players: float, by_place: dict, by_time_control: dict):
+        """ A method to display statistics on the tournaments. """
+        self.display_message(f"{number} tournoi{'s' * (number > 1)} enregistré{'s' * (number > 1)}.")
+        if not number:
+            return
+        self.display_message(f"En moyenne {rounds:.1f} rounds joués et {players:.1f} joueurs par tournoi.")
+        self.display_message("\nPar lieu :")
+        for place, count in sorted(by_place.items(), key=lambda item: -item[1]):
+            self.display_message(f" {place} : {count}")
+        self.display_message("\nPar gestion du temps :")
+        for time_control, count in sorted(by_time_control.items(), key=lambda item: -item[1]):
+            self.display_message(f" {time_control} : {count}")
+
+
+class ReportView(View):
+    """ A view to write reports in files. Rows are given as iterables and written one by one, so a report is never
+    entirely kept in memory. """
+    def enter_export_choice(self):
+        """ A method to get what to export. """
+        return self.enter_information("Voulez-vous exporter :\n 1 - Un tournoi ?\n 2 - Tous les tournois ?\n")
+
+    @staticmethod
+    def write_csv(path: str, header: list, rows):
+        """ A method to write a CSV report. """
+        with open(path, "w", newline="", encoding="utf-8") as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    @staticmethod
+    def write_pgn(path: str, games):
+        """ A method to write a PGN-style results file: each game is a dict of PGN tags, and its 'Result' tag is
+        also used as movetext. """
+        with open(path, "w", encoding="utf-8") as report_file:
+            for tags in games:
+                for tag, value in tags.items():
+                    escaped_value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+                    report_file.write(f'[{tag} "{escaped_value}"]\n')
+                report_file.write(f"\n{tags['Result']}\n\n")
+
+    @staticmethod
+    def write_html(path: str, title: str, tables):
+        """ A method to write a static HTML report. Tables are (caption, header, rows) tuples, and cells can be
+        (text, link) tuples to display links. """
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(f'<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="utf-8">\n'
+                              f"<title>{escape(title)}</title>\n</head>\n<body>\n<h1>{escape(title)}</h1>\n")
+            for caption, header, rows in tables:
+                report_file.write(f"<table>\n<caption>{escape(caption)}</caption>\n<tr>"
+                                  f"{''.join(f'<th>{escape(str(cell))}</th>' for cell in header)}</tr>\n")
+                for row in rows:
+                    report_file.write(f"<tr>{''.join(ReportView._html_cell(cell) for cell in row)}</tr>\n")
+                report_file.write("</table>\n")
+            report_file.write("</body>\n</html>\n")
+
+    @staticmethod
+    def _html_cell(cell):
+        """ Return a HTML table cell, with a link if the cell is a (text, link) tuple. """
+        if isinstance(cell, tuple):
+            return f'<td><a href="{escape(cell[1])}">{escape(str(cell[0]))}</a></td>'
+        return f"<td>{escape(str(cell))}</td>"
 
 
 # execution ----------------------------------------------------------------------------------------------------------